@@ -1,5 +1,6 @@
 import datetime
 from classes.bond import Bond
+from utils.slots import copy_slots, get_slots_state, restore_slots
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -8,8 +9,43 @@ if TYPE_CHECKING:
 
 
 class BondCalculator(Bond):
+    """
+    Bond bound to its services. The schedules and the inflation coefficients are read (and replaced) through the source bond :
+    replacing them on the bond reaches every calculator built from it. The other fields are copied when the calculator is built.
+    """
+    __slots__ = ("_time_convention_service", "_inflation_service", "_bond")
+
     def __init__(self, bond : Bond):
-        super().__init__(**bond.__dict__)
+        copy_slots(source= bond, target= self)
+        for slot in ("_coupons", "_redemptions", "_inflation_coefficients"): # Read through the source bond (no stale copies kept alive)
+            if hasattr(self, slot): delattr(self, slot)
+        self._bond = bond
+
+    @property
+    def coupons(self): return self._bond.coupons
+
+    @coupons.setter
+    def coupons(self, coupons): self._bond.coupons = coupons
+
+    @property
+    def redemptions(self): return self._bond.redemptions
+
+    @redemptions.setter
+    def redemptions(self, redemptions): self._bond.redemptions = redemptions
+
+    @property
+    def inflation_coefficients(self): return self._bond.inflation_coefficients
+
+    @inflation_coefficients.setter
+    def inflation_coefficients(self, inflation_coefficients): self._bond.inflation_coefficients = inflation_coefficients
+
+    def __reduce__(self):
+        # Pickled as a plain Bond with the current schedules of the source bond
+        state = get_slots_state(self, Bond)
+        state.update(_coupons= self.coupons, _redemptions= self.redemptions)
+        inflation_coefficients = getattr(self, "inflation_coefficients", None)
+        if inflation_coefficients is not None: state["_inflation_coefficients"] = inflation_coefficients
+        return (restore_slots, (Bond, state))
 
     # SERVICE : TimeConventionService
     @property
@@ -32,4 +68,9 @@ class BondCalculator(Bond):
     @inflation_service.setter
     def inflation_service(self, inflation_service : "AbstractInflationService"):
         self._inflation_service = inflation_service
-        return self
\ No newline at end of file
+        return self
+
+    @property
+    def inflation_dependencies(self):
+        """Dependency keys (see utils.dependencies) of the inflation data used to adjust the cashflows of the bond."""
+        return self.inflation_service.dependencies(bond= self)
\ No newline at end of file
@@ -1,5 +1,7 @@
 import datetime
 from classes.bond_position import BondPosition
+from utils.slots import copy_slots
+from utils.dependencies import dependency_tracker
 
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
@@ -10,8 +12,11 @@ if TYPE_CHECKING:
 
 
 class BondPositionCalculator(BondPosition):
+    # _yield_rate : (generation, stamp, yield rate) entry of utils.dependencies
+    __slots__ = ("_yield_rate", "_yield_rate_service", "_amortization_service")
+
     def __init__(self, bond_position : BondPosition, bond : "BondCalculator"):
-        super().__init__(**bond_position.__dict__)
+        copy_slots(source= bond_position, target= self)
         self.bond = bond
         self._yield_rate = None
 
@@ -25,8 +30,13 @@ class BondPositionCalculator(BondPosition):
     def yield_rate_service(self, _yield_rate_service : "YieldRateService"): self._yield_rate_service = _yield_rate_service    
 
     def compute_yield_rate(self):
-        if self._yield_rate is None: self._yield_rate = self.yield_rate_service.compute_yield_rate(bond_position=self)
-        return self._yield_rate
+        # Solved again once the position, the bond or the inflation data it is computed from are updated
+        self._yield_rate, yield_rate = dependency_tracker.get_or_compute(
+            entry= self._yield_rate,
+            dependencies= lambda : self.dependencies + self.bond.inflation_dependencies,
+            compute= lambda : self.yield_rate_service.compute_yield_rate(bond_position=self),
+        )
+        return yield_rate
 
 
     # SERVICE : YieldRateService
@@ -40,5 +50,10 @@ class BondPositionCalculator(BondPosition):
 
     def compute_amortization(self, date : datetime.datetime): return self.amortization_service.compute_amortization(bond_position=self, date= date)
     def compute_amortized_price(self, date : datetime.datetime): return self.amortization_service.compute_amortized_price(bond_position=self, date= date)
-    def compute_amortization_profile(self, interval = datetime.timedelta(days = 1)): return self.amortization_service.compute_amortization_profile(bond_position=self, interval = interval)
+    def compute_amortization_profile(self, interval = datetime.timedelta(days = 1), **kwargs): return self.amortization_service.compute_amortization_profile(bond_position=self, interval = interval, **kwargs)
+    def compute_amortized_price_grid(self, dates : list, yield_rates = None, yield_shifts = None): return self.amortization_service.compute_amortized_price_grid(bond_position=self, dates= dates, yield_rates= yield_rates, yield_shifts= yield_shifts)
+    def compute_amortized_price_paths(self, date : datetime.datetime): return self.amortization_service.compute_amortized_price_paths(bond_position=self, date= date)
+    def compute_risk_measures(self, date : datetime.datetime): return self.amortization_service.compute_risk_measures(bond_position=self, date= date)
+    def compute_snapshot(self, date : datetime.datetime): return self.amortization_service.compute_snapshot(bond_position=self, date= date)
+    def compute_snapshots(self, dates : list): return self.amortization_service.compute_snapshots(bond_position=self, dates= dates)
     
\ No newline at end of file
@@ -1,13 +1,44 @@
 from typing import Any
+import hashlib
 import numpy as np
-import pandas as pd
 import datetime
 from classes.time_convention import TimeConvention
 from classes.cashflows import Cashflows
 from classes.security import Security
+from utils.slots import get_slots_state, restore_slots
+from utils.dependencies import dependency_tracker
+
+
+class InflationCoefficients(dict):
+    """{date : coefficient} of a bond. Every write invalidates its dependency key : only the results computed from it are recomputed."""
+    __slots__ = ()
+
+    @property
+    def dependency(self): return ("inflation_coefficients", id(self))
+
+    def __setitem__(self, date, coefficient):
+        super().__setitem__(date, coefficient)
+        dependency_tracker.invalidate(self.dependency)
+
+    def __delitem__(self, date):
+        super().__delitem__(date)
+        dependency_tracker.invalidate(self.dependency)
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        dependency_tracker.invalidate(self.dependency)
+
+    def clear(self):
+        super().clear()
+        dependency_tracker.invalidate(self.dependency)
+
+    def __reduce__(self): return (InflationCoefficients, (dict(self),))
 
 
 class Bond(Security):
+    # inflation_coefficients is optional (used by ForcedFixedInflationService)
+    __slots__ = ("emission_date", "maturity_date", "time_convention", "inflation_index", "_redemptions", "_coupons", "base", "_inflation_coefficients")
+
     def __init__(
         self,
         emission_date: datetime.date,
@@ -31,8 +62,69 @@ class Bond(Security):
         self.coupons = coupons
         self.base = base
 
+    # Replacing a schedule invalidates the results computed from the previous one
+    @property
+    def coupons(self) -> Cashflows: return self._coupons
+
+    @coupons.setter
+    def coupons(self, coupons : Cashflows):
+        previous_coupons = getattr(self, "_coupons", None)
+        self._coupons = coupons
+        if previous_coupons is not None and previous_coupons is not coupons: dependency_tracker.invalidate(previous_coupons.dependency)
+
+    @property
+    def redemptions(self) -> Cashflows: return self._redemptions
+
+    @redemptions.setter
+    def redemptions(self, redemptions : Cashflows):
+        previous_redemptions = getattr(self, "_redemptions", None)
+        self._redemptions = redemptions
+        if previous_redemptions is not None and previous_redemptions is not redemptions: dependency_tracker.invalidate(previous_redemptions.dependency)
+
+    @property
+    def inflation_coefficients(self): return self._inflation_coefficients
+
+    @inflation_coefficients.setter
+    def inflation_coefficients(self, inflation_coefficients : dict):
+        if inflation_coefficients is not None and not isinstance(inflation_coefficients, InflationCoefficients):
+            inflation_coefficients = InflationCoefficients(inflation_coefficients)
+        self._inflation_coefficients = inflation_coefficients
+        if inflation_coefficients is not None: dependency_tracker.invalidate(inflation_coefficients.dependency)
+
+    @property
+    def dependencies(self):
+        """Dependency keys (see utils.dependencies) of the content of the bond : its schedule and its inflation coefficients."""
+        inflation_coefficients = getattr(self, "inflation_coefficients", None)
+        if inflation_coefficients is None: return (self.coupons.dependency, self.redemptions.dependency)
+        return (self.coupons.dependency, self.redemptions.dependency, inflation_coefficients.dependency)
+
+    @property
+    def fingerprint(self):
+        """Content fingerprint (hex digest), recomputed once its schedule or its inflation coefficients are updated or replaced."""
+        self._fingerprint, fingerprint = dependency_tracker.get_or_compute(
+            entry= self._fingerprint, dependencies= lambda : self.dependencies, compute= self.compute_fingerprint,
+        )
+        return fingerprint
+
+    def compute_fingerprint(self):
+        """Fingerprint of the schedule and parameters of the bond (security_id and issuer excluded) : two identical bonds share it."""
+        inflation_coefficients = getattr(self, "inflation_coefficients", None)
+        return hashlib.sha1(repr((
+            self.coupons.fingerprint, self.redemptions.fingerprint,
+            self.emission_date.isoformat(), self.maturity_date.isoformat(), float(self.base), str(self.time_convention), self.inflation_index,
+            sorted(inflation_coefficients.items()) if inflation_coefficients is not None else None,
+        )).encode()).hexdigest()
+
+    def __reduce__(self):
+        # Pickled as a plain Bond : calculators leave their services (and caches) behind, the receiving process binds its own
+        return (restore_slots, (Bond, get_slots_state(self, Bond)))
+
+    def __eq__(self, other : Security):
+        # Same security_id, else (two bonds without id) same identity fingerprint, as __hash__
+        if not isinstance(other, Security): return NotImplemented
+        if self.security_id is not None or other.security_id is not None: return self.security_id == other.security_id
+        return self.identity_fingerprint == other.identity_fingerprint
 
-    def __eq__(self, other : Security): return hash(self.security_id) == hash(other.security_id)
     def __hash__(self): return super().__hash__()
 
     
@@ -1,14 +1,46 @@
 import datetime
-import pandas as pd
+import hashlib
 from classes.bond import Bond
+from utils.slots import get_slots_state, restore_slots
+from utils.dependencies import dependency_tracker
 
 class BondPosition:
+    __slots__ = ("bond", "nominal", "acquisition_date", "acquisition_clean_price", "_fingerprint")
+
     def __init__(self, bond : Bond, nominal : float, acquisition_date : datetime.datetime, acquisition_clean_price : float):
         self.bond = bond
         self.nominal = nominal
         self.acquisition_date = acquisition_date
         self.acquisition_clean_price = acquisition_clean_price
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self):
+        """Content fingerprint of the position (bond content, nominal, acquisition date and price), recomputed once one of them is updated."""
+        self._fingerprint, fingerprint = dependency_tracker.get_or_compute(
+            entry= self._fingerprint, dependencies= lambda : self.dependencies, compute= lambda : hashlib.sha1(repr((
+                self.bond.fingerprint, float(self.nominal), self.acquisition_date.isoformat(), float(self.acquisition_clean_price)
+            )).encode()).hexdigest(),
+        )
+        return fingerprint
+
+    @property
+    def dependency(self): return ("bond_position", id(self))
+
+    @property
+    def dependencies(self):
+        """Dependency keys (see utils.dependencies) of the content of the position."""
+        return (self.dependency,) + self.bond.dependencies
+
+    def update(self, **fields):
+        """Updates fields of the position (ex : amended acquisition_clean_price) : the results computed from the position are recomputed."""
+        for name, value in fields.items(): setattr(self, name, value)
+        dependency_tracker.invalidate(self.dependency)
     
+    def __reduce__(self):
+        # Pickled as a plain BondPosition (see Bond.__reduce__)
+        return (restore_slots, (BondPosition, get_slots_state(self, BondPosition)))
+
     def __hash__(self):
         return hash((self.bond,self.nominal, self.acquisition_date, self.acquisition_clean_price))
     
@@ -1,15 +1,24 @@
 from typing import Any
+import hashlib
 import numpy as np
-import pandas as pd
 import datetime
+from utils.lazy_import import lazy_import
+from utils.dependencies import dependency_tracker
+
+pd = lazy_import("pandas")
 
 
 class Cashflows:
+    # _shared : (block name, offset, length, dates dtype) when the arrays were copied to a SharedCashflowsBlock
+    __slots__ = ("data", "root", "_fingerprint", "_shared")
+
     def __init__(self, dates : np.ndarray, amounts : np.ndarray):
         self.data = pd.Series(index = dates, data = amounts, dtype= float)
         if not self.data.index.is_monotonic_increasing: self.data.sort_index(inplace= True)
         if not self.data.index.is_unique: self.data = self.data.groupby(level=0).sum()
         self.root = self
+        self._fingerprint = None
+        self._shared = None
 
     @classmethod
     def _create(cls, parent: "Cashflows", data):
@@ -17,6 +26,30 @@ class Cashflows:
         instance = cls.__new__(cls)  # Creates an uninitialized instance
         instance.data = data  # Ensure a copy to avoid side effects
         instance.root = parent.root
+        instance._fingerprint = None
+        instance._shared = None
+        return instance
+
+    @classmethod
+    def _from_arrays(cls, dates : np.ndarray, amounts : np.ndarray, fingerprint = None):
+        """Creates a root Cashflows from sorted unique dates without copying the arrays (unpickling)."""
+        instance = cls.__new__(cls)
+        instance.data = pd.Series(index= pd.Index(dates, copy= False), data= amounts, dtype= float, copy= False)
+        instance.root = instance
+        instance._fingerprint = fingerprint
+        instance._shared = None
+        return instance
+
+    # --- Pickling : raw numpy buffers (no pandas objects, no root chain) ---
+    def __reduce__(self):
+        if self._shared is not None:
+            from utils.shared_memory import attach_cashflows
+            return (attach_cashflows, self._shared + (self._fingerprint,))
+        return (Cashflows._from_arrays, (self.dates, np.asarray(self.amounts, dtype= float), self._fingerprint))
+
+    def __copy__(self):
+        instance = Cashflows._create(parent = self, data = self.data)
+        instance._fingerprint = self._fingerprint
         return instance
 
     # --- Encapsulating `.loc` and `.iloc` ---
@@ -28,6 +61,20 @@ class Cashflows:
     def dates(self): return self.data.index.values
     @property
     def amounts(self): return self.data.values
+
+    @property
+    def fingerprint(self):
+        """Content fingerprint (sha1 hex digest) of the dates and amounts. Computed once, reset when written through loc / iloc."""
+        if self._fingerprint is None:
+            digest = hashlib.sha1(self.dates.astype("datetime64[s]").astype(np.int64).tobytes())
+            digest.update(np.asarray(self.amounts, dtype= float).tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @property
+    def dependency(self):
+        """Dependency key of the cashflows (see utils.dependencies) : invalidated when written through loc / iloc."""
+        return ("cashflows", id(self))
     
     def __repr__(self): return repr(self.data)
 
@@ -45,13 +92,35 @@ class Cashflows:
         if not isinstance(other, Cashflows):
             return Cashflows._create(parent = self, data = self.data.__add__(other))
 
-        combined_data = self.data.add(other.data, fill_value=0)  # Ensures missing dates are handled
-        return Cashflows._create(self, combined_data)
+        return merge_cashflows([self, other])
     
     def add_cashflow(self, date, amount):
-        new_cashflow = pd.Series(data=[amount], index=[date], dtype= float)
-        new_data = self.data.add(new_cashflow, fill_value= 0)
-        return Cashflows._create(parent = self, data=new_data)
+        return merge_cashflows([self, ([np.datetime64(date, "us")], [amount])])
+
+
+def merge_cashflows(streams : list):
+    """
+    Merges sorted cashflow streams (Cashflows or (dates, amounts) pairs) into one root Cashflows, summing amounts of a same date.
+    Each cashflow is written once at its rank in the merged output (its index in its stream plus the cashflows of the other streams
+    before it, by binary search) : one allocation, no sort. Same date amounts are then summed by one reduceat.
+    """
+    streams = [(stream.dates, stream.amounts) if isinstance(stream, Cashflows) else stream for stream in streams]
+    streams = [(np.asarray(stream_dates), np.asarray(stream_amounts, dtype= float)) for stream_dates, stream_amounts in streams]
+    if len(streams) == 1: return Cashflows._from_arrays(dates= streams[0][0], amounts= streams[0][1])
+
+    dates = np.empty(sum(len(stream_dates) for stream_dates, _ in streams), dtype= np.result_type(*[stream_dates for stream_dates, _ in streams]))
+    amounts = np.empty(len(dates), dtype= float)
+    for i, (stream_dates, stream_amounts) in enumerate(streams):
+        ranks = np.arange(len(stream_dates))
+        # Same dates keep the order of the streams
+        for j, (other_dates, _) in enumerate(streams):
+            if j != i: ranks += np.searchsorted(other_dates, stream_dates, side= "right" if j < i else "left")
+        dates[ranks], amounts[ranks] = stream_dates, stream_amounts
+
+    if len(dates) > 1:
+        starts = np.flatnonzero(np.concatenate(([True], dates[1:] != dates[:-1])))
+        if len(starts) < len(dates): dates, amounts = dates[starts], np.add.reduceat(amounts, starts)
+    return Cashflows._from_arrays(dates= dates, amounts= amounts)
 
 
 class _LocIndexer:
@@ -59,6 +128,8 @@ class _LocIndexer:
     Encapsulates cashflows.data.loc[...] access. 
     Returns either a Cashflows object (slice) or a scalar (single value).
     """
+    __slots__ = ("parent",)
+
     def __init__(self, parent: "Cashflows"):
         self.parent = parent
 
@@ -74,12 +145,16 @@ class _LocIndexer:
     def __setitem__(self, key, value):
         # Allow writing to the underlying data
         self.parent.data.loc[key] = value
+        self.parent._fingerprint = self.parent._shared = None
+        dependency_tracker.invalidate(self.parent.dependency)
 
 
 class _IlocIndexer:
     """
     Encapsulates cashflows.data.iloc[...] access.
     """
+    __slots__ = ("parent",)
+
     def __init__(self, parent: "Cashflows"):
         self.parent = parent
 
@@ -92,6 +167,8 @@ class _IlocIndexer:
 
     def __setitem__(self, key, value):
         self.parent.data.iloc[key] = value
+        self.parent._fingerprint = self.parent._shared = None
+        dependency_tracker.invalidate(self.parent.dependency)
 
 if __name__ == "__main__":
     dates = np.arange(
@@ -1,11 +1,33 @@
 import random
 
 class Security:
+    __slots__ = ("issuer", "security_id", "_fingerprint", "_hash_fingerprint")
+
     def __init__(self, issuer=None, security_id=None) -> None:
         self.issuer = issuer
         self.security_id = security_id
+        self._fingerprint = None
+        self._hash_fingerprint = None
+
+    @property
+    def fingerprint(self):
+        """Content fingerprint (hex digest), computed once."""
+        if self._fingerprint is None: self._fingerprint = self.compute_fingerprint()
+        return self._fingerprint
+
+    def compute_fingerprint(self):
+        # The content of a generic security is unknown : random fingerprint, unique to this instance
+        return f"{random.getrandbits(64):016x}"
+
+    @property
+    def identity_fingerprint(self):
+        """
+        Fingerprint frozen at its first access, identifying a security without security_id in __hash__ and __eq__ : both stay consistent
+        when the content is updated afterwards (caches key on the live fingerprint instead).
+        """
+        if self._hash_fingerprint is None: self._hash_fingerprint = self.fingerprint
+        return self._hash_fingerprint
 
     def __hash__(self):
         if self.security_id is not None: return self.security_id.__hash__()
-        if not hasattr(self, "__random_hash__"): self.__random_hash__ = random.getrandbits(64)
-        return self.__random_hash__
\ No newline at end of file
+        return self.identity_fingerprint.__hash__()
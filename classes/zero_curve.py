@@ -0,0 +1,21 @@
+import hashlib
+import numpy as np
+from classes.time_convention import TimeConvention
+
+class ZeroCurve:
+    """Zero coupon rates (annual compounding) by tenor in years. Tenors are measured with time_convention from the valuation date."""
+    __slots__ = ("tenors", "zero_rates", "time_convention")
+
+    def __init__(self, tenors : np.ndarray, zero_rates : np.ndarray, time_convention = TimeConvention.ACT_365):
+        index_sorted = np.argsort(tenors)
+        self.tenors = np.asarray(tenors, dtype= float)[index_sorted]
+        self.zero_rates = np.asarray(zero_rates, dtype= float)[index_sorted]
+        self.time_convention = time_convention
+
+    @property
+    def fingerprint(self):
+        """Content fingerprint (sha1 hex digest) of the tenors, zero rates and time convention. Recomputed on each access : the rates may be edited in place."""
+        digest = hashlib.sha1(np.asarray(self.tenors, dtype= float).tobytes())
+        digest.update(np.asarray(self.zero_rates, dtype= float).tobytes())
+        digest.update(str(self.time_convention).encode())
+        return digest.hexdigest()
@@ -4,23 +4,29 @@ from enum import Enum
 from classes.bond_position import BondPosition
 from calculators.bond_position import BondPositionCalculator
 from services.yield_rate import YieldRateService
+from services.yield_store import SQLiteYieldStore
 from services.amortization import ActuarialAmortizationService
 from services.bond_cashflow import BaseCashflowService, DailyCouponCashflowService
 from services.accrued_coupon import AbstractAccruedCouponService, LinearAccruedCouponService
-from services.inflation import AbstractInflationService, NoInflationService
+from services.inflation import AbstractInflationService
+from services.solver import AbstractSolver
+from services.solver_telemetry import SolverTelemetryService
 from factories.amortization.amortization import AbstractAmortizationFactory
 
 
 class ClassicActuarialAmortizationFactory(AbstractAmortizationFactory):
     def __init__(self,
-            accrued_coupon_service : AbstractAccruedCouponService = LinearAccruedCouponService(),
-            inflation_service : AbstractInflationService = NoInflationService()
+            accrued_coupon_service : AbstractAccruedCouponService = None,
+            inflation_service : AbstractInflationService = None,
+            yield_store : SQLiteYieldStore = None,
+            solver : AbstractSolver = None,
+            solver_telemetry : SolverTelemetryService = None
         ):
         super().__init__(inflation_service= inflation_service)
-        self.accrued_coupon_service = accrued_coupon_service
+        self.accrued_coupon_service = accrued_coupon_service if accrued_coupon_service is not None else LinearAccruedCouponService()
         self.bond_cashflow_service = BaseCashflowService(accrued_coupon_service=self.accrued_coupon_service)
         self.amortization_service = ActuarialAmortizationService(bond_cashflow_service = self.bond_cashflow_service)
-        self.yield_rate_service = YieldRateService(amortization_service= self.amortization_service)
+        self.yield_rate_service = YieldRateService(solver= solver, amortization_service= self.amortization_service, yield_store= yield_store, solver_telemetry= solver_telemetry)
 
     def create_bond_position_calculator(self, bond_position : BondPosition):
         bond = self.create_bond_calculator(bond = bond_position.bond)
@@ -31,11 +37,12 @@ class ClassicActuarialAmortizationFactory(AbstractAmortizationFactory):
 
 
 class DailyCouponActuarialAmortizationFactory(AbstractAmortizationFactory):
-    def __init__(self, inflation_service : AbstractInflationService = NoInflationService()):
+    def __init__(self, inflation_service : AbstractInflationService = None, yield_store : SQLiteYieldStore = None, solver : AbstractSolver = None,
+            solver_telemetry : SolverTelemetryService = None):
         super().__init__(inflation_service= inflation_service)
         self.bond_cashflow_service = DailyCouponCashflowService()
         self.amortization_service = ActuarialAmortizationService(bond_cashflow_service = self.bond_cashflow_service)
-        self.yield_rate_service = YieldRateService(amortization_service= self.amortization_service)
+        self.yield_rate_service = YieldRateService(solver= solver, amortization_service= self.amortization_service, yield_store= yield_store, solver_telemetry= solver_telemetry)
 
     def create_bond_position_calculator(self, bond_position : BondPosition):
         bond = self.create_bond_calculator(bond = bond_position.bond)
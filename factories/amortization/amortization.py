@@ -8,17 +8,24 @@ from factories.time_convention import TimeConventionFactory
 
 class AbstractAmortizationFactory(ABC):
     def __init__(self,
-            inflation_service : AbstractInflationService = NoInflationService()
+            inflation_service : AbstractInflationService = None
         ):
         self.time_convention_factory = TimeConventionFactory()
-        self.inflation_service = inflation_service
+        self.inflation_service = inflation_service if inflation_service is not None else NoInflationService()
+        self._bond_calculators = {} # Flyweight registry : security_id : (bond fingerprint, bond calculator)
 
     def create_bond_calculator(self, bond : Bond):
+        # Reused while the bond content is the same (a replaced schedule / inflation coefficients or another bond under this id gets its own calculator)
+        if bond.security_id is not None:
+            fingerprint, bond_calculator = self._bond_calculators.get(bond.security_id, (None, None))
+            if fingerprint is not None and fingerprint == bond.fingerprint: return bond_calculator
+
         bond_calculator = BondCalculator(bond = bond)
         bond_calculator.time_convention_service = self.time_convention_factory.create_time_convention_service(
             time_convention=bond.time_convention
         )
         bond_calculator.inflation_service = self.inflation_service
+        if bond.security_id is not None: self._bond_calculators[bond.security_id] = (bond.fingerprint, bond_calculator)
         return bond_calculator
     
     @abstractmethod
@@ -3,11 +3,11 @@ from calculators.bond_position import BondPositionCalculator
 from services.amortization import LinearAmortizationService
 from services.bond_cashflow import BaseCashflowService
 from services.accrued_coupon import  NoAccruedCouponService
-from services.inflation import AbstractInflationService, NoInflationService
+from services.inflation import AbstractInflationService
 from factories.amortization.amortization import AbstractAmortizationFactory
 
 class LinearAmortizationFactory(AbstractAmortizationFactory):
-    def __init__(self, inflation_service : AbstractInflationService= NoInflationService()):
+    def __init__(self, inflation_service : AbstractInflationService = None):
         super().__init__(inflation_service=inflation_service)
         self.accrued_coupon_service = NoAccruedCouponService() #No used because we don't compute future coupons => no accrued coupon needed
         self.bond_cashflow_service = BaseCashflowService(accrued_coupon_service = self.accrued_coupon_service)
@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 import datetime
 
@@ -10,7 +9,8 @@ from settings import medium_lru_cache_size
 
 class AbstractAccruedCouponService(Service, ABC):
     @abstractmethod
-    def compute_accrued_coupon(self, bond_position_calculator : BondPositionCalculator,  date : datetime.datetime):
+    def compute_accrued_coupon(self, bond_position_calculator : BondPositionCalculator,  date : datetime.datetime, yield_rate = None):
+        """yield_rate (float or np.ndarray) overrides the yield of the position for yield dependent services."""
         ...
 
     
@@ -26,10 +26,26 @@ class AbstractAccruedCouponService(Service, ABC):
 
         return bond_position, amount, start_date, end_date
 
+    def _compute_parameters_array(self, bond_position : BondPositionCalculator, dates : np.ndarray):
+        """Array-of-dates form of _compute_parameters (amounts are 0 after the last coupon)."""
+        coupon_dates = bond_position.bond.coupons.dates
+        next_coupon_indexes = coupon_dates.searchsorted(dates, side = "right")
+        n = len(coupon_dates)
+        amounts = np.where(next_coupon_indexes < n, bond_position.bond.coupons.amounts[np.minimum(next_coupon_indexes, n-1)] / bond_position.bond.base * bond_position.nominal, 0)
+        end_dates = coupon_dates[np.minimum(next_coupon_indexes, n-1)].astype("datetime64[s]")
+        start_dates = np.where(next_coupon_indexes > 0, coupon_dates[np.maximum(next_coupon_indexes - 1, 0)], np.datetime64(bond_position.bond.emission_date)).astype("datetime64[s]")
+        return amounts, start_dates, end_dates
+
+    def compute_accrued_coupons(self, bond_position : BondPositionCalculator, dates : np.ndarray, yield_rate = None):
+        """Array-of-dates form of compute_accrued_coupon."""
+        return np.array([
+            self.compute_accrued_coupon(bond_position, date.astype(datetime.datetime), yield_rate= yield_rate) for date in np.asarray(dates).astype("datetime64[us]")
+        ], dtype= float)
+
     
 
 class LinearAccruedCouponService(AbstractAccruedCouponService):
-    def compute_accrued_coupon(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+    def compute_accrued_coupon(self, bond_position : BondPositionCalculator, date : datetime.datetime, yield_rate = None):
         bond_position, amount, start_date, end_date  = self._compute_parameters(bond_position=bond_position, date= date)
         if start_date == date: return 0
 
@@ -41,23 +57,47 @@ class LinearAccruedCouponService(AbstractAccruedCouponService):
             / bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_date, to_dates=end_date)
         )[0]
 
+    def compute_accrued_coupons(self, bond_position : BondPositionCalculator, dates : np.ndarray, yield_rate = None):
+        dates = np.asarray(dates).astype("datetime64[s]")
+        amounts, start_dates, end_dates = self._compute_parameters_array(bond_position= bond_position, dates= dates)
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            ratios = (
+                bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_dates, to_dates=dates)
+                / bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_dates, to_dates=end_dates)
+            )
+        return np.where(start_dates == dates, 0, amounts * ratios)
+
 class ActuarialAccruedCouponService(AbstractAccruedCouponService):
-    def compute_accrued_coupon(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+    def compute_accrued_coupon(self, bond_position : BondPositionCalculator, date : datetime.datetime, yield_rate = None):
         bond_position, amount, start_date, end_date  = self._compute_parameters(bond_position=bond_position, date= date)
         if start_date == date: return 0
 
         start_date = np.array([start_date], dtype= 'datetime64[s]')
         end_date = np.array([end_date], dtype = "datetime64[s]") 
         date =  np.array([date], dtype= 'datetime64[s]')
-        delta_before_t = bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_date, to_dates=date)
-        delta_total =  bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_date, to_dates=end_date)
+        delta_before_t = bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_date, to_dates=date)[0]
+        delta_total =  bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_date, to_dates=end_date)[0]
 
+        if yield_rate is None: yield_rate = bond_position.compute_yield_rate()
+        else: yield_rate = np.asarray(yield_rate, dtype= float)
 
         return amount *(
-            ((1 + bond_position.compute_yield_rate()) ** delta_before_t - 1) 
-            / ((1 + bond_position.compute_yield_rate()) ** delta_total - 1)
-        )[0]
+            ((1 + yield_rate) ** delta_before_t - 1) 
+            / ((1 + yield_rate) ** delta_total - 1)
+        )
+
+    def compute_accrued_coupons(self, bond_position : BondPositionCalculator, dates : np.ndarray, yield_rate = None):
+        dates = np.asarray(dates).astype("datetime64[s]")
+        amounts, start_dates, end_dates = self._compute_parameters_array(bond_position= bond_position, dates= dates)
+        delta_before_t = bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_dates, to_dates=dates)
+        delta_total = bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates=start_dates, to_dates=end_dates)
+
+        if yield_rate is None: yield_rate = bond_position.compute_yield_rate()
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            accrued_coupons = amounts * (((1 + yield_rate) ** delta_before_t - 1) / ((1 + yield_rate) ** delta_total - 1))
+        return np.where(start_dates == dates, 0, accrued_coupons)
 
 
 class NoAccruedCouponService(AbstractAccruedCouponService):
-    def compute_accrued_coupon(self, bond_position : BondPositionCalculator, date : datetime.datetime): return 0
\ No newline at end of file
+    def compute_accrued_coupon(self, bond_position : BondPositionCalculator, date : datetime.datetime, yield_rate = None): return 0
+    def compute_accrued_coupons(self, bond_position : BondPositionCalculator, dates : np.ndarray, yield_rate = None): return np.zeros(len(dates), dtype= float)
\ No newline at end of file
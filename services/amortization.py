@@ -1,27 +1,32 @@
 from abc import ABC, abstractmethod
-import pandas as pd
 import numpy as np
 import datetime
 import logging
+from utils.lazy_import import lazy_import
+from utils.dedupe import dedupe
+from utils.metrics import timed
 
 from classes.bond_position import BondPosition
 from calculators.bond_position import BondPositionCalculator
 
 from services.service import Service
 from services.bond_cashflow import BaseCashflowService
+from services.inflation import SimulatedInflationPathsService
+
+pd = lazy_import("pandas")
 
 class AbstractAmortizationService(Service, ABC):
     @abstractmethod
     def compute_amortization(self,
             bond_position : BondPositionCalculator,
-            date: pd.Timestamp,
+            date: datetime.datetime,
         ):
         ...
 
     @abstractmethod
     def compute_amortized_price(self,
             bond_position : BondPositionCalculator,
-            date: pd.Timestamp,
+            date: datetime.datetime,
         ):
         ...
 
@@ -38,6 +43,25 @@ class AbstractAmortizationService(Service, ABC):
 
         return pd.Series(index= dates, data = amortizations)
 
+    def compute_snapshot(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+        """Every valuation measure of the position at date. yield_rate is only defined for actuarial amortization (nan otherwise)."""
+        alive = date < bond_position.bond.maturity_date
+        return {
+            "amortization" : self.compute_amortization(bond_position= bond_position, date= date),
+            "amortized_price" : self.compute_amortized_price(bond_position= bond_position, date= date),
+            "accrued_coupon" : self.bond_cashflow_service.accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date) if alive else 0,
+            "yield_rate" : np.nan,
+            "remaining_redemptions" : self.bond_cashflow_service.compute_future_redemptions(bond_position= bond_position, date= date).amounts.sum() if alive else 0,
+        }
+
+    def compute_snapshots(self, bond_position : BondPositionCalculator, dates : list):
+        """Array-of-dates form of compute_snapshot : returns a DataFrame indexed by dates."""
+        return pd.DataFrame([self.compute_snapshot(bond_position= bond_position, date= date) for date in dates], index= dates, columns= _snapshot_columns)
+
+    def compute_portfolio_snapshots(self, bond_positions : list, date : datetime.datetime):
+        """Array-of-positions form of compute_snapshot : returns a DataFrame with one row per position (same order)."""
+        return pd.DataFrame([self.compute_snapshot(bond_position= bond_position, date= date) for bond_position in bond_positions], columns= _snapshot_columns)
+
 class LinearAmortizationService(AbstractAmortizationService):
     def __init__(self,  bond_cashflow_service = None):
         super().__init__()
@@ -59,6 +83,7 @@ class LinearAmortizationService(AbstractAmortizationService):
             / bond_position.bond.time_convention_service.year_count(bond_position= bond_position, from_dates = np.datetime64(bond_position.acquisition_date, "ns"), to_dates = np.datetime64(bond_position.bond.maturity_date, "ns"))
         )
  
+    @timed("compute_amortized_price")
     def compute_amortized_price(self, bond_position, date):
         return bond_position.acquisition_clean_price + self.compute_amortization(bond_position = bond_position, date = date)
 
@@ -82,6 +107,7 @@ class FullAmortizationService(AbstractAmortizationService):
         total_redemption_price = self.bond_cashflow_service.compute_future_redemptions(bond_position= bond_position, date= bond_position.acquisition_date).amounts.sum()
         return (total_redemption_price - bond_position.acquisition_clean_price)
     
+    @timed("compute_amortized_price")
     def compute_amortized_price(self, bond_position : BondPositionCalculator, date : datetime.datetime):
         return self.bond_cashflow_service.compute_future_redemptions(bond_position= bond_position, date= date).amounts.sum()
 
@@ -98,6 +124,53 @@ class ActuarialAmortizationService(AbstractAmortizationService):
         self.bond_cashflow_service = bond_cashflow_service
         self.full_amortization_service = FullAmortizationService(bond_cashflow_service=bond_cashflow_service)
 
+    def compute_amortization_profile(self, bond_position : BondPositionCalculator, interval : datetime.timedelta, closed_form = True):
+        """
+        closed_form : between two cashflow dates the discounted value of the future cashflows accretes at (1 + y) ** dt (year counts are additive).
+        Cashflows are discounted once at the acquisition date : the value at each date is its suffix sum (cashflows after the date) accreted to the date,
+        so the cost grows with the number of cashflows, profile dates only going through vectorized operations.
+        Cashflows adjusted by inflation at each date are computed date by date.
+        """
+        inflation_service = bond_position.bond.inflation_service
+        if not closed_form or bond_position.bond.inflation_index is not None or inflation_service.adjusts_non_indexed_bonds:
+            return super().compute_amortization_profile(bond_position= bond_position, interval= interval)
+
+        acquisition_date = np.datetime64(bond_position.acquisition_date, "us")
+        if isinstance(interval, datetime.timedelta):
+            step = np.timedelta64(interval, "us")
+            nb_dates = max(int(np.ceil((np.datetime64(bond_position.bond.maturity_date, "us") - acquisition_date) / step)), 0)
+            dates = acquisition_date + np.arange(nb_dates) * step
+        else: # Calendar intervals (ex : relativedelta)
+            dates, date = [], bond_position.acquisition_date
+            while date < bond_position.bond.maturity_date:
+                dates.append(date)
+                date += interval
+            dates = np.array(dates, dtype= "datetime64[us]")
+
+        yield_rate = bond_position.compute_yield_rate()
+        time_convention_service = bond_position.bond.time_convention_service
+        cashflows = self.bond_cashflow_service.compute_future_cashflows(bond_position= bond_position, date= bond_position.acquisition_date, _accrued_coupon_amount= 0)
+        redemptions = self.bond_cashflow_service.compute_future_redemptions(bond_position= bond_position, date= bond_position.acquisition_date)
+
+        # Suffix sums of the cashflows discounted at the acquisition date (last one : no cashflow left)
+        discounted_amounts = cashflows.amounts / ((1 + yield_rate) ** time_convention_service.year_count(bond_position= bond_position, from_dates= acquisition_date, to_dates= cashflows.dates))
+        discounted_suffix_sums = np.append(np.cumsum(discounted_amounts[::-1])[::-1], 0)
+        redemption_suffix_sums = np.append(np.cumsum(redemptions.amounts[::-1])[::-1], 0)
+
+        # Future cashflows of a date are the ones strictly after it
+        dirty_prices = (
+            discounted_suffix_sums[np.searchsorted(cashflows.dates, dates, side= "right")]
+            * (1 + yield_rate) ** time_convention_service.year_count(bond_position= bond_position, from_dates= acquisition_date, to_dates= dates)
+        )
+        accrued_coupons = self.bond_cashflow_service.accrued_coupon_service.compute_accrued_coupons(bond_position= bond_position, dates= dates)
+        amortized_prices = dirty_prices - np.where(accrued_coupons >= 1E-6, accrued_coupons, 0) # Same threshold as compute_future_cashflows
+
+        # Same cases as compute_amortization where the amortization is 0
+        remaining_redemptions = redemption_suffix_sums[np.searchsorted(redemptions.dates, dates, side= "right")]
+        nothing_to_amortize = np.abs(remaining_redemptions - bond_position.acquisition_clean_price) < 1E-3
+        amortizations = np.where(nothing_to_amortize, 0, amortized_prices - bond_position.acquisition_clean_price)
+        return pd.Series(index= dates, data= amortizations)
+
     def compute_amortization(
             self,
             bond_position : BondPositionCalculator,
@@ -125,12 +198,16 @@ class ActuarialAmortizationService(AbstractAmortizationService):
 
         return amortization
 
+    @timed("compute_amortized_price")
     def compute_amortized_price(
-        self, bond_position: BondPositionCalculator, date
+        self, bond_position: BondPositionCalculator, date, yield_rate = None
     ):
+        """yield_rate overrides the yield of the position (ex : trial yields of the solver), the position is never mutated."""
+        if yield_rate is None: yield_rate = bond_position.compute_yield_rate()
         cashflows = self.bond_cashflow_service.compute_future_cashflows(
             bond_position=bond_position,
-            date= date
+            date= date,
+            yield_rate= yield_rate
         )
         date_np64 = np.datetime64(date)
         cashflow_dates, cashflow_amounts = cashflows.dates, cashflows.amounts
@@ -140,7 +217,7 @@ class ActuarialAmortizationService(AbstractAmortizationService):
             bond_position= bond_position, from_dates= date_np64, to_dates=cashflow_dates)
         
         # Actualize cashflows
-        actualized_cashflow = cashflow_amounts / ((1+ bond_position.compute_yield_rate()) ** time_powers)
+        actualized_cashflow = cashflow_amounts / ((1+ yield_rate) ** time_powers)
 
         amortized_price = np.sum(actualized_cashflow)
 
@@ -149,8 +226,264 @@ class ActuarialAmortizationService(AbstractAmortizationService):
         # print("amounts " ,cashflow_amounts)
         # print("dates " ,cashflow_dates)
         # print("time_powers ", time_powers)
-        # print("yield_rate" , bond_position._yield_rate)
+        # print("yield_rate" , yield_rate)
         # print("discounted", actualized_cashflow)
         # print("price", amortized_price)
 
-        return amortized_price
\ No newline at end of file
+        return amortized_price
+    def compute_amortized_prices_at_yields(self, bond_position : BondPositionCalculator, date : datetime.datetime, yield_rates : np.ndarray):
+        """
+        compute_amortized_price at date for an array of yield rates at once, without needing the yield of the position.
+        The accrued coupon of inflation linked bonds is not inflation adjusted here : an estimate for such bonds.
+        """
+        yield_rates = np.asarray(yield_rates, dtype= float)
+        cashflows = self.bond_cashflow_service.compute_future_cashflows(bond_position= bond_position, date= date, _accrued_coupon_amount= 0)
+        time_powers = bond_position.bond.time_convention_service.year_count(
+            bond_position= bond_position, from_dates= np.datetime64(date), to_dates= cashflows.dates)
+        accrued_coupons = np.asarray(self.bond_cashflow_service.accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date, yield_rate= yield_rates), dtype= float)
+        accrued_coupons = np.where(accrued_coupons >= 1E-6, accrued_coupons, 0) # Same threshold as compute_future_cashflows
+        return (cashflows.amounts[None, :] / ((1 + yield_rates[:, None]) ** time_powers[None, :])).sum(axis= 1) - accrued_coupons
+
+    def compute_cashflow_grid(self, bond_position : BondPositionCalculator, dates : list, accrued_coupon_amounts : list = None):
+        """
+        Stacks the future cashflows of each date into (dates x cashflows) arrays, padded with 0 amounts.
+        Returns the amounts, their time powers and the accrued coupon leg of each date (paid at t = 0, removed from amounts).
+        accrued_coupon_amounts can be given when already computed by the caller.
+        """
+        dates_np64 = np.array(dates, dtype= "datetime64[us]")
+        if accrued_coupon_amounts is None: accrued_coupon_amounts = [None] * len(dates)
+        cashflows_list = [
+            self.bond_cashflow_service.compute_future_cashflows(bond_position= bond_position, date= date, _accrued_coupon_amount= accrued_coupon_amount)
+            for date, accrued_coupon_amount in zip(dates, accrued_coupon_amounts)
+        ]
+
+        nb_cashflows = max([len(cashflows) for cashflows in cashflows_list], default= 0)
+        amounts = np.zeros(shape= (len(dates), nb_cashflows), dtype= float)
+        from_dates = np.repeat(dates_np64[:, None], nb_cashflows, axis= 1)
+        cashflow_dates = from_dates.copy()
+        for i, cashflows in enumerate(cashflows_list):
+            amounts[i, :len(cashflows)] = cashflows.amounts
+            cashflow_dates[i, :len(cashflows)] = cashflows.dates
+
+        # Compute time powers of every date at once
+        time_powers = bond_position.bond.time_convention_service.year_count(
+            bond_position= bond_position, from_dates= from_dates, to_dates= cashflow_dates)
+
+        at_date = cashflow_dates == from_dates
+        accrued_amounts = np.where(at_date, amounts, 0).sum(axis= 1)
+        amounts = np.where(at_date, 0, amounts)
+        return amounts, time_powers, accrued_amounts
+
+    def compute_amortized_price_grid(self, bond_position : BondPositionCalculator, dates : list, yield_rates = None, yield_shifts = None):
+        """
+        Amortized prices under several yield scenarios, as a (scenarios x dates) matrix.
+        Scenarios are given either as absolute yield_rates or as yield_shifts applied to the yield of the position.
+        """
+        if (yield_rates is None) == (yield_shifts is None): raise ValueError("Please provide either yield_rates or yield_shifts")
+        if yield_rates is None: yield_rates = bond_position.compute_yield_rate() + np.asarray(yield_shifts, dtype= float)
+        yield_rates = np.atleast_1d(np.asarray(yield_rates, dtype= float))
+
+        amounts, time_powers, accrued_amounts = self.compute_cashflow_grid(bond_position= bond_position, dates= dates)
+
+        # Actualize cashflows of every scenario and date in one broadcast : (scenarios x dates x cashflows)
+        actualized_cashflows = amounts[None, :, :] / ((1 + yield_rates[:, None, None]) ** time_powers[None, :, :])
+        amortized_prices = actualized_cashflows.sum(axis= 2)
+
+        # The accrued coupon is not discounted but may depend on the yield (ex : ActuarialAccruedCouponService)
+        accrued_coupon_service = self.bond_cashflow_service.accrued_coupon_service
+        for i, date in enumerate(dates):
+            if accrued_amounts[i] == 0: continue
+            accrued_ratios = (
+                accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date, yield_rate= yield_rates)
+                / accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date)
+            )
+            amortized_prices[:, i] += accrued_amounts[i] * accrued_ratios
+
+        return amortized_prices
+
+    def compute_amortized_price_paths(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+        """
+        Amortized prices under every path of a SimulatedInflationPathsService, as a (paths,) array.
+        The yield rate of the position is kept (solved on the reference path of the service).
+        """
+        inflation_service = bond_position.bond.inflation_service
+        if not isinstance(inflation_service, SimulatedInflationPathsService):
+            raise ValueError(f"Please provide a SimulatedInflationPathsService to compute amortized prices of inflation paths (got {inflation_service.__class__.__name__})")
+
+        cashflows = self.bond_cashflow_service.compute_future_cashflows(bond_position= bond_position, date= date, _apply_inflation= False)
+        adjusted_amounts = inflation_service.compute_adjusted_amounts(bond_position= bond_position, cashflows= cashflows, computation_date= date)
+
+        # Compute time powers
+        time_powers = bond_position.bond.time_convention_service.year_count(
+            bond_position= bond_position, from_dates= np.datetime64(date), to_dates= cashflows.dates)
+
+        # Actualize cashflows of every path at once : (paths x cashflows)
+        actualized_cashflows = adjusted_amounts / ((1 + bond_position.compute_yield_rate()) ** time_powers[None, :])
+        return actualized_cashflows.sum(axis= 1)
+
+    def _compute_amounts_and_time_powers(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+        # After the maturity date there is nothing left to value
+        if date >= bond_position.bond.maturity_date: return np.zeros(0, dtype= float), np.zeros(0, dtype= float)
+        cashflows = self.bond_cashflow_service.compute_future_cashflows(bond_position= bond_position, date= date)
+        time_powers = bond_position.bond.time_convention_service.year_count(
+            bond_position= bond_position, from_dates= np.datetime64(date), to_dates= cashflows.dates)
+        return cashflows.amounts, time_powers
+
+    def compute_risk_measures(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+        """
+        Amortized price, Macaulay duration, modified duration and convexity from a single discounting of the future cashflows.
+        Sensitivities are taken with respect to the yield rate of the position, the accrued coupon being held fixed.
+        """
+        amounts, time_powers = self._compute_amounts_and_time_powers(bond_position= bond_position, date= date)
+        risk_measures = _compute_risk_measures(amounts= amounts, time_powers= time_powers, yield_rates= bond_position.compute_yield_rate())
+        return {name : measure.item() for name, measure in risk_measures.items()}
+
+    def compute_portfolio_risk_measures(self, bond_positions : list, date : datetime.datetime):
+        """
+        Batch form of compute_risk_measures : returns a DataFrame with one row per position (same order).
+        Identical positions (same content fingerprint and services) are valued once.
+        """
+        bond_positions, inverse = dedupe(bond_positions, key= _calculation_key)
+        amounts_list, time_powers_list = zip(*[
+            self._compute_amounts_and_time_powers(bond_position= bond_position, date= date) for bond_position in bond_positions
+        ]) if len(bond_positions) > 0 else ([], [])
+
+        # Stack every position into (positions x cashflows) arrays, padded with 0 amounts
+        nb_cashflows = max([len(amounts) for amounts in amounts_list], default= 0)
+        amounts = np.zeros(shape= (len(bond_positions), nb_cashflows), dtype= float)
+        time_powers = np.zeros(shape= (len(bond_positions), nb_cashflows), dtype= float)
+        for i, (position_amounts, position_time_powers) in enumerate(zip(amounts_list, time_powers_list)):
+            amounts[i, :len(position_amounts)] = position_amounts
+            time_powers[i, :len(position_time_powers)] = position_time_powers
+        yield_rates = np.array([bond_position.compute_yield_rate() for bond_position in bond_positions], dtype= float)
+
+        risk_measures = _compute_risk_measures(amounts= amounts, time_powers= time_powers, yield_rates= yield_rates)
+        return pd.DataFrame({name : measure[inverse] for name, measure in risk_measures.items()})
+
+
+    def compute_snapshot(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+        return self.compute_snapshots(bond_position= bond_position, dates= [date]).iloc[0].to_dict()
+
+    def compute_snapshots(self, bond_position : BondPositionCalculator, dates : list):
+        """
+        Fused computation of every valuation measure at each date : the redemption legs and accrued coupons are computed once,
+        then shared by the amortized price (one year_count call and one discounting over the (dates x cashflows) grid) and the amortization.
+        """
+        yield_rate = bond_position.compute_yield_rate()
+        snapshots = {column : np.zeros(len(dates), dtype= float) for column in _snapshot_columns}
+        snapshots["yield_rate"][:] = yield_rate
+
+        # After the maturity date there is nothing left to value
+        alive_indexes = [i for i, date in enumerate(dates) if date < bond_position.bond.maturity_date]
+        alive_dates = [dates[i] for i in alive_indexes]
+        if len(alive_dates) > 0:
+            remaining_redemptions = np.array([
+                self.bond_cashflow_service.compute_future_redemptions(bond_position= bond_position, date= date).amounts.sum() for date in alive_dates
+            ], dtype= float)
+            accrued_coupons = np.array([
+                self.bond_cashflow_service.accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date) for date in alive_dates
+            ], dtype= float)
+
+            amounts, time_powers, accrued_amounts = self.compute_cashflow_grid(bond_position= bond_position, dates= alive_dates, accrued_coupon_amounts= accrued_coupons)
+            amortized_prices = (amounts / ((1 + yield_rate) ** time_powers)).sum(axis= 1) + accrued_amounts
+
+            # Same cases as compute_amortization where the amortization is 0
+            before_acquisition = np.array([date < bond_position.acquisition_date for date in alive_dates])
+            nothing_to_amortize = (np.abs(remaining_redemptions - bond_position.acquisition_clean_price) < 1E-3) & (bond_position.bond.inflation_index is None)
+            amortizations = np.where(before_acquisition | nothing_to_amortize, 0, amortized_prices - bond_position.acquisition_clean_price)
+
+            snapshots["amortization"][alive_indexes] = amortizations
+            snapshots["amortized_price"][alive_indexes] = amortized_prices
+            snapshots["accrued_coupon"][alive_indexes] = accrued_coupons
+            snapshots["remaining_redemptions"][alive_indexes] = remaining_redemptions
+
+        return pd.DataFrame(snapshots, index= dates, columns= _snapshot_columns)
+
+    def compute_portfolio_snapshots(self, bond_positions : list, date : datetime.datetime):
+        """
+        Every valuation measure of several positions at one date (one row per position, same order). The cashflows of every position
+        are discounted at once : one year_count call per time convention (per bond when it depends on the coupon schedule).
+        """
+        snapshots = {column : np.zeros(len(bond_positions), dtype= float) for column in _snapshot_columns}
+        yield_rates = np.array([bond_position.compute_yield_rate() for bond_position in bond_positions], dtype= float)
+        snapshots["yield_rate"][:] = yield_rates
+
+        # After the maturity date there is nothing left to value
+        alive_indexes = np.array([i for i, bond_position in enumerate(bond_positions) if date < bond_position.bond.maturity_date], dtype= int)
+        alive_positions = [bond_positions[i] for i in alive_indexes]
+        if len(alive_positions) == 0: return pd.DataFrame(snapshots, columns= _snapshot_columns)
+
+        remaining_redemptions = np.array([
+            self.bond_cashflow_service.compute_future_redemptions(bond_position= bond_position, date= date).amounts.sum() for bond_position in alive_positions
+        ], dtype= float)
+        accrued_coupons = np.array([
+            self.bond_cashflow_service.accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date) for bond_position in alive_positions
+        ], dtype= float)
+        cashflows_list = [
+            self.bond_cashflow_service.compute_future_cashflows(bond_position= bond_position, date= date, _accrued_coupon_amount= accrued_coupon)
+            for bond_position, accrued_coupon in zip(alive_positions, accrued_coupons)
+        ]
+
+        # Flatten every cashflow, owners[k] being the (alive) position of the cashflow k
+        lengths = np.array([len(cashflows) for cashflows in cashflows_list], dtype= int)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        owners = np.repeat(np.arange(len(alive_positions)), lengths)
+        cashflow_dates = np.concatenate([cashflows.dates.astype("datetime64[us]") for cashflows in cashflows_list])
+        cashflow_amounts = np.concatenate([np.asarray(cashflows.amounts, dtype= float) for cashflows in cashflows_list])
+
+        time_powers = np.zeros(len(cashflow_dates), dtype= float)
+        groups = {}
+        for i, bond_position in enumerate(alive_positions):
+            time_convention_service = bond_position.bond.time_convention_service
+            key = (time_convention_service, bond_position.bond) if time_convention_service.schedule_dependent else time_convention_service
+            groups.setdefault(key, []).append(i)
+        for positions in groups.values():
+            cashflow_indexes = np.concatenate([np.arange(starts[i], starts[i] + lengths[i]) for i in positions])
+            bond_position = alive_positions[positions[0]]
+            time_powers[cashflow_indexes] = bond_position.bond.time_convention_service.year_count(
+                bond_position= bond_position, from_dates= np.datetime64(date, "us"), to_dates= cashflow_dates[cashflow_indexes])
+
+        discounted_amounts = cashflow_amounts / ((1 + yield_rates[alive_indexes][owners]) ** time_powers)
+        amortized_prices = np.bincount(owners, weights= discounted_amounts, minlength= len(alive_positions))
+
+        # Same cases as compute_amortization where the amortization is 0
+        acquisition_clean_prices = np.array([bond_position.acquisition_clean_price for bond_position in alive_positions], dtype= float)
+        before_acquisition = np.array([date < bond_position.acquisition_date for bond_position in alive_positions], dtype= bool)
+        nothing_to_amortize = (np.abs(remaining_redemptions - acquisition_clean_prices) < 1E-3) & np.array([bond_position.bond.inflation_index is None for bond_position in alive_positions], dtype= bool)
+
+        snapshots["amortization"][alive_indexes] = np.where(before_acquisition | nothing_to_amortize, 0, amortized_prices - acquisition_clean_prices)
+        snapshots["amortized_price"][alive_indexes] = amortized_prices
+        snapshots["accrued_coupon"][alive_indexes] = accrued_coupons
+        snapshots["remaining_redemptions"][alive_indexes] = remaining_redemptions
+        return pd.DataFrame(snapshots, columns= _snapshot_columns)
+
+
+_snapshot_columns = ["amortization", "amortized_price", "accrued_coupon", "yield_rate", "remaining_redemptions"]
+
+def _calculation_key(bond_position : BondPositionCalculator):
+    # Two positions with the same key give the same valuations
+    return (
+        bond_position.fingerprint, bond_position.bond.time_convention_service, bond_position.bond.inflation_service,
+        bond_position.yield_rate_service, bond_position.amortization_service,
+    )
+
+def _compute_risk_measures(amounts : np.ndarray, time_powers : np.ndarray, yield_rates : np.ndarray):
+    """Risk measures along the last axis of amounts and time_powers, yield_rates broadcasting over the other axes."""
+    yield_rates = np.asarray(yield_rates, dtype= float)
+    actualized_cashflows = amounts / ((1 + yield_rates[..., None]) ** time_powers)
+
+    price = actualized_cashflows.sum(axis= -1)
+    time_weighted = (time_powers * actualized_cashflows).sum(axis= -1)
+    time_squared_weighted = (time_powers * (time_powers + 1) * actualized_cashflows).sum(axis= -1)
+
+    with np.errstate(divide= "ignore", invalid= "ignore"):
+        macaulay_duration = time_weighted / price
+        modified_duration = macaulay_duration / (1 + yield_rates)
+        convexity = time_squared_weighted / (price * (1 + yield_rates) ** 2)
+
+    return {
+        "price" : price,
+        "macaulay_duration" : macaulay_duration,
+        "modified_duration" : modified_duration,
+        "convexity" : convexity,
+    }
@@ -0,0 +1,115 @@
+import asyncio
+import datetime
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from classes.bond_position import BondPosition
+from services.service import Service
+from settings import big_lru_cache_size
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from factories.amortization.amortization import AbstractAmortizationFactory
+
+
+class AsyncPricingService(Service):
+    """
+    Asyncio front-end over an amortization factory.
+    Concurrent requests are collected during batch_window seconds (or until max_batch_size requests are pending),
+    identical (position, date, measure) requests are deduplicated and each position is valued once for all its dates
+    with compute_snapshots, in an executor.
+    The default executor has a single worker, pass a ThreadPoolExecutor with several workers to run batches in parallel.
+    """
+    def __init__(self, factory : "AbstractAmortizationFactory", batch_window = 0.002, max_batch_size = 1_000, executor = None):
+        self.factory = factory
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers= 1)
+
+        self._calculators = OrderedDict() # position fingerprint : calculator, kept between batches so that solved yields stay warm
+        self._calculators_lock = threading.Lock()
+        self._pending = {}
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def compute(self, bond_position : BondPosition, date : datetime.datetime, measure = "amortized_price"):
+        """measure is one of the compute_snapshot keys (amortization, amortized_price, accrued_coupon, yield_rate, remaining_redemptions)"""
+        # Keyed on the content of the position (not on a hash : colliding requests must not share a result)
+        key = (bond_position.fingerprint, date, measure)
+        if key in self._pending: future = self._pending[key][3]
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = (bond_position, date, measure, future)
+            if len(self._pending) >= self.max_batch_size: self._flush()
+            elif self._flush_handle is None: self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        # Shield : a cancelled caller must not cancel the result shared with the other callers
+        return await asyncio.shield(future)
+
+    async def compute_amortized_price(self, bond_position : BondPosition, date : datetime.datetime):
+        return await self.compute(bond_position= bond_position, date= date, measure= "amortized_price")
+
+    async def compute_amortization(self, bond_position : BondPosition, date : datetime.datetime):
+        return await self.compute(bond_position= bond_position, date= date, measure= "amortization")
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        requests, self._pending = list(self._pending.values()), {}
+        if len(requests) == 0: return
+
+        task = asyncio.ensure_future(self._run_batch(requests))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, requests : list):
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, self.compute_batch, [(bond_position, date, measure) for bond_position, date, measure, _ in requests]
+            )
+        except Exception as exception:
+            results = [exception] * len(requests)
+
+        for (_, _, _, future), result in zip(requests, results):
+            if future.done(): continue
+            if isinstance(result, Exception): future.set_exception(result)
+            else: future.set_result(result)
+
+    def _get_calculator(self, bond_position : BondPosition):
+        key = bond_position.fingerprint
+        with self._calculators_lock:
+            if key in self._calculators:
+                self._calculators.move_to_end(key)
+                return self._calculators[key]
+
+            calculator = self.factory.create_bond_position_calculator(bond_position= bond_position)
+            self._calculators[key] = calculator
+            if len(self._calculators) > big_lru_cache_size: self._calculators.popitem(last= False)
+            return calculator
+
+    def compute_batch(self, requests : list):
+        """
+        Synchronous batch : requests is a list of (bond_position, date, measure).
+        Returns the list of results, or the exception raised while valuing the position of the request.
+        """
+        # Group requests by position content : duplicated lots are valued once
+        groups = {}
+        for i, (bond_position, date, measure) in enumerate(requests):
+            groups.setdefault(bond_position.fingerprint, (bond_position, []))[1].append(i)
+
+        results = [None] * len(requests)
+        for bond_position, indexes in groups.values():
+            try:
+                calculator = self._get_calculator(bond_position= bond_position)
+                dates = list(dict.fromkeys([requests[i][1] for i in indexes]))
+                snapshots = calculator.compute_snapshots(dates= dates)
+                for i in indexes:
+                    _, date, measure = requests[i]
+                    results[i] = float(snapshots.loc[date, measure])
+            except Exception as exception:
+                for i in indexes: results[i] = exception
+        return results
@@ -1,11 +1,10 @@
-import pandas as pd
 import numpy as np
 import datetime
 from utils.lru_cache import lru_cache
 
 from abc import ABC, abstractmethod
 
-from classes.cashflows import Cashflows
+from classes.cashflows import Cashflows, merge_cashflows
 from classes.bond_position import BondPosition
 from calculators.bond_position import BondPositionCalculator
 from services.service import Service
@@ -13,6 +12,23 @@ from services.accrued_coupon import AbstractAccruedCouponService, LinearAccruedC
 from settings import medium_lru_cache_size
 
 from utils.speed_analyser import step_timer
+from utils.metrics import timed
+
+def _bond_cache_key(self, bond_position : BondPositionCalculator, *args, **kwargs):
+    # Bond level computations are shared by every position of the same bond : keyed on its content (a new bond under a known security_id,
+    # or a replaced schedule, gets its own entries)
+    return (self, bond_position.bond, bond_position.bond.fingerprint, args, frozenset(kwargs.items()))
+
+def _position_cache_key(self, bond_position : BondPositionCalculator, *args, **kwargs):
+    return (self, bond_position, bond_position.bond.fingerprint, args, frozenset(kwargs.items()))
+
+def _schedule_dependencies(self, bond_position : BondPositionCalculator, *args, **kwargs):
+    return bond_position.bond.dependencies
+
+def _cashflow_dependencies(self, bond_position : BondPositionCalculator, date = None, _apply_inflation = True):
+    # Schedule of the bond (and inflation data when the cashflows are adjusted)
+    if not _apply_inflation: return bond_position.bond.dependencies
+    return bond_position.bond.dependencies + bond_position.bond.inflation_dependencies
 
 class AbstractCashflowService(Service, ABC):
     @abstractmethod
@@ -24,7 +40,7 @@ class AbstractCashflowService(Service, ABC):
         ...
     
     @abstractmethod
-    def compute_future_cashflows(self, bond_position : BondPositionCalculator, date : datetime.datetime) -> Cashflows:
+    def compute_future_cashflows(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True, yield_rate = None) -> Cashflows:
         ...
 
 
@@ -32,35 +48,49 @@ class BaseCashflowService(AbstractCashflowService):
     def __init__(self, accrued_coupon_service : AbstractAccruedCouponService = None):
         self.accrued_coupon_service = accrued_coupon_service if accrued_coupon_service is not None else LinearAccruedCouponService()
 
-    @lru_cache(maxsize = medium_lru_cache_size)
+    # Per position legs only scale the bond level legs (shared by every position on the same bond calculator) by the nominal
+    @lru_cache(maxsize = medium_lru_cache_size, key = _position_cache_key, dependencies = _cashflow_dependencies)
     def compute_future_coupons(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True):
-        future_coupons = self._transform_cashflows(bond_position = bond_position, cashflows = bond_position.bond.coupons, date = date)
-        if _apply_inflation: future_coupons = bond_position.bond.inflation_service.compute_adjusted_cashflows(bond_position= bond_position, cashflows=future_coupons, computation_date=date)
-        return future_coupons
+        return self._compute_bond_future_coupons(bond_position= bond_position, date= date, _apply_inflation= _apply_inflation) * (bond_position.nominal / bond_position.bond.base)
     
-    @lru_cache(maxsize = medium_lru_cache_size)
+    @lru_cache(maxsize = medium_lru_cache_size, key = _position_cache_key, dependencies = _cashflow_dependencies)
     def compute_future_redemptions(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True):
-        future_redemptions = self._transform_cashflows(bond_position = bond_position, cashflows = bond_position.bond.redemptions, date = date)
+        return self._compute_bond_future_redemptions(bond_position= bond_position, date= date, _apply_inflation= _apply_inflation) * (bond_position.nominal / bond_position.bond.base)
+
+    @lru_cache(maxsize = medium_lru_cache_size, key = _bond_cache_key, dependencies = _cashflow_dependencies)
+    def _compute_bond_future_coupons(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True):
+        """Future coupons for a nominal equal to the base of the bond. Cached by bond : bond_position is only used through bond_position.bond."""
+        future_coupons = self._select_future_cashflows(bond_position = bond_position, cashflows = bond_position.bond.coupons, date = date)
+        if _apply_inflation: future_coupons = bond_position.bond.inflation_service.compute_adjusted_cashflows(bond_position= bond_position, cashflows=future_coupons, computation_date=date)
+        return future_coupons
+
+    @lru_cache(maxsize = medium_lru_cache_size, key = _bond_cache_key, dependencies = _cashflow_dependencies)
+    def _compute_bond_future_redemptions(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True):
+        """Future redemptions for a nominal equal to the base of the bond. Cached by bond : bond_position is only used through bond_position.bond."""
+        future_redemptions = self._select_future_cashflows(bond_position = bond_position, cashflows = bond_position.bond.redemptions, date = date)
         if _apply_inflation: future_redemptions = bond_position.bond.inflation_service.compute_adjusted_cashflows(bond_position= bond_position, cashflows=future_redemptions, computation_date=date)
         return future_redemptions
     
-    def compute_future_cashflows(self, bond_position : BondPositionCalculator, date : datetime.datetime):
+    @timed("compute_future_cashflows")
+    def compute_future_cashflows(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True, _accrued_coupon_amount = None, yield_rate = None):
         coupons = self.compute_future_coupons(bond_position= bond_position, date = date, _apply_inflation = False)
         redemptions = self.compute_future_redemptions(bond_position= bond_position, date = date, _apply_inflation = False)
-        cashflows = coupons + redemptions
-        # Adding Accrued coupon
-        accrued_coupon_amount = self.accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date) 
-        if accrued_coupon_amount >= 1E-6: cashflows = cashflows.add_cashflow(date = date, amount = - accrued_coupon_amount)
-
-        cashflows = bond_position.bond.inflation_service.compute_adjusted_cashflows(bond_position= bond_position, cashflows=cashflows, computation_date=date)
+        streams = [coupons, redemptions]
+        # Adding Accrued coupon (unless already computed by the caller)
+        accrued_coupon_amount = _accrued_coupon_amount
+        if accrued_coupon_amount is None: accrued_coupon_amount = self.accrued_coupon_service.compute_accrued_coupon(bond_position= bond_position, date= date, yield_rate= yield_rate) 
+        if accrued_coupon_amount >= 1E-6: streams.append(([np.datetime64(date, "us")], [- accrued_coupon_amount]))
+        # Single sorted merge of the legs
+        cashflows = merge_cashflows(streams)
+
+        if _apply_inflation: cashflows = bond_position.bond.inflation_service.compute_adjusted_cashflows(bond_position= bond_position, cashflows=cashflows, computation_date=date)
         return cashflows
     
-    def _transform_cashflows(self, bond_position : BondPositionCalculator, cashflows : Cashflows, date : datetime.datetime, _apply_inflation = True):
-        future_cashflows = cashflows.loc[
+    def _select_future_cashflows(self, bond_position : BondPositionCalculator, cashflows : Cashflows, date : datetime.datetime):
+        return cashflows.loc[
             date + datetime.timedelta(seconds=1) : 
             bond_position.bond.maturity_date + datetime.timedelta(seconds=1)
-        ]  / bond_position.bond.base * bond_position.nominal
-        return future_cashflows
+        ]
     
 
 
@@ -68,7 +98,7 @@ class DailyCouponCashflowService(BaseCashflowService):
     def __init__(self):
         super().__init__(accrued_coupon_service = NoAccruedCouponService())
 
-    @lru_cache(maxsize = medium_lru_cache_size)
+    @lru_cache(maxsize = medium_lru_cache_size, key = _bond_cache_key, dependencies = _schedule_dependencies)
     def compute_day_coupons(self, bond_position : BondPositionCalculator) -> Cashflows:
         coupon_dates = bond_position.bond.coupons.dates
         coupon_amounts = bond_position.bond.coupons.amounts
@@ -99,8 +129,9 @@ class DailyCouponCashflowService(BaseCashflowService):
 
         return Cashflows(dates=daily_coupon_dates, amounts = daily_coupon_amounts)
     
-    def compute_future_coupons(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True):
+    @lru_cache(maxsize = medium_lru_cache_size, key = _bond_cache_key, dependencies = _cashflow_dependencies)
+    def _compute_bond_future_coupons(self, bond_position : BondPositionCalculator, date : datetime.datetime, _apply_inflation = True):
         daily_coupons = self.compute_day_coupons(bond_position = bond_position)
-        future_daily_coupons = self._transform_cashflows(bond_position = bond_position, cashflows = daily_coupons, date = date)
+        future_daily_coupons = self._select_future_cashflows(bond_position = bond_position, cashflows = daily_coupons, date = date)
         if _apply_inflation: future_daily_coupons = bond_position.bond.inflation_service.compute_adjusted_cashflows(bond_position= bond_position, cashflows=future_daily_coupons, computation_date=date)
         return future_daily_coupons
\ No newline at end of file
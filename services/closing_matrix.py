@@ -0,0 +1,48 @@
+import os
+import time
+import numpy as np
+
+from calculators.bond_position import BondPositionCalculator
+from services.service import Service
+from services.amortization import _snapshot_columns, _calculation_key
+from utils.dedupe import dedupe
+from utils.metrics import metrics
+
+
+class ClosingMatrixService(Service):
+    """
+    Accounting close output : one (positions x dates) float64 matrix per measure, written position chunk by position chunk
+    into {directory}/{measure}.npy memory mapped files (with {directory}/dates.npy). Only one chunk is held in memory ;
+    the files can be opened by downstream tools with np.load(path, mmap_mode= "r") and sliced directly.
+    Identical positions of a chunk (duplicated lots) are valued once.
+    """
+    def __init__(self, chunk_size = 1_000):
+        self.chunk_size = chunk_size
+
+    def compute_closing_matrices(self, bond_positions : "list[BondPositionCalculator]", dates : list, directory : str, measures = ("amortization", "amortized_price")):
+        """Returns {measure : read only memmap} of the written matrices. Measures are columns of compute_snapshots."""
+        unknown_measures = [measure for measure in measures if measure not in _snapshot_columns]
+        if len(unknown_measures) > 0: raise ValueError(f"Unknown measure(s) {unknown_measures}, available : {_snapshot_columns}")
+
+        run_start = time.perf_counter()
+        os.makedirs(directory, exist_ok= True)
+        np.save(os.path.join(directory, "dates.npy"), np.array(dates, dtype= "datetime64[us]"))
+        paths = {measure : os.path.join(directory, f"{measure}.npy") for measure in measures}
+        matrices = {
+            measure : np.lib.format.open_memmap(path, mode= "w+", dtype= np.float64, shape= (len(bond_positions), len(dates)))
+            for measure, path in paths.items()
+        }
+
+        for start in range(0, len(bond_positions), self.chunk_size):
+            chunk, inverse = dedupe(bond_positions[start : start + self.chunk_size], key= _calculation_key)
+            chunk_values = {measure : np.empty(shape= (len(chunk), len(dates)), dtype= np.float64) for measure in measures}
+            for i, bond_position in enumerate(chunk):
+                snapshots = bond_position.compute_snapshots(dates= dates)
+                for measure in measures: chunk_values[measure][i] = snapshots[measure].values
+            for measure in measures:
+                matrices[measure][start : start + len(inverse)] = chunk_values[measure][inverse]
+                matrices[measure].flush()
+
+        del matrices # Closes the writable maps
+        if metrics.enabled: metrics.record_run(run= "closing_matrix", nb_positions= len(bond_positions), elapsed= time.perf_counter() - run_start)
+        return {measure : np.load(path, mmap_mode= "r") for measure, path in paths.items()}
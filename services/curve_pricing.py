@@ -0,0 +1,76 @@
+import numpy as np
+import datetime
+
+from classes.cashflows import Cashflows
+from classes.zero_curve import ZeroCurve
+from calculators.bond_position import BondPositionCalculator
+from services.service import Service
+from services.bond_cashflow import BaseCashflowService
+from services.solver import Interpolation2DEngine
+from factories.time_convention import TimeConventionFactory
+from utils.lru_cache import lru_cache
+from settings import small_lru_cache_size
+
+def _curve_cache_key(self, curve : ZeroCurve, date : datetime.datetime, nb_days : int):
+    # Content of the curve, not its id : a new curve (possibly at a recycled address) or edited rates get their own grid
+    return (self, curve.fingerprint, date, nb_days)
+
+class CurvePricingService(Service):
+    """
+    Prices positions off a ZeroCurve instead of a single yield rate. The discount factors of every day from the valuation date
+    to the horizon are computed once per (curve, date, horizon) : pricing a cashflow stream is then a gather of its daily
+    discount factors and a dot product. Cashflows come from bond_cashflow_service (inflation adjusted, accrued coupon deducted),
+    so prices are clean like the amortized prices.
+    """
+    def __init__(self, bond_cashflow_service : BaseCashflowService = None, horizon = datetime.timedelta(days = 366 * 60)):
+        self.bond_cashflow_service = bond_cashflow_service if bond_cashflow_service is not None else BaseCashflowService()
+        self.time_convention_factory = TimeConventionFactory()
+        self.horizon = horizon
+
+    @lru_cache(maxsize = small_lru_cache_size, key = _curve_cache_key)
+    def compute_discount_factor_grid(self, curve : ZeroCurve, date : datetime.datetime, nb_days : int):
+        """Discount factors of the nb_days days following date (date included), rates being flat extrapolated outside the tenors."""
+        from_date = np.datetime64(date, "D")
+        grid_dates = from_date + np.arange(nb_days).astype("timedelta64[D]")
+        # Curves are not attached to a bond : conventions relying on a coupon schedule (ACT/ACT ICMA) cannot be used
+        times = self.time_convention_factory.create_time_convention_service(time_convention= curve.time_convention).year_count(
+            bond_position= None, from_dates= np.full(nb_days, from_date), to_dates= grid_dates)
+        times = np.asarray(times, dtype= float)
+
+        if len(curve.tenors) == 1: zero_rates = np.full(nb_days, curve.zero_rates[0])
+        else: zero_rates = Interpolation2DEngine(X= curve.tenors, Y= curve.zero_rates).interpolate(np.clip(times, curve.tenors[0], curve.tenors[-1]))
+        return (1 + zero_rates) ** (- times)
+
+    def _get_discount_factor_grid(self, curve : ZeroCurve, date : datetime.datetime, max_day : int):
+        nb_days = (np.datetime64(date + self.horizon, "D") - np.datetime64(date, "D")).astype(int)
+        while nb_days <= max_day: nb_days *= 2 # Cashflows beyond the horizon : longer grid
+        return self.compute_discount_factor_grid(curve= curve, date= date, nb_days= int(nb_days))
+
+    def compute_cashflows_present_values(self, cashflows_list : "list[Cashflows]", curve : ZeroCurve, date : datetime.datetime):
+        """Present values at date of several cashflow streams : one gather over every cashflow and one sum per stream."""
+        lengths = np.array([len(cashflows) for cashflows in cashflows_list], dtype= int)
+        if lengths.sum() == 0: return np.zeros(len(cashflows_list), dtype= float)
+        dates = np.concatenate([cashflows.dates.astype("datetime64[D]") for cashflows in cashflows_list])
+        amounts = np.concatenate([np.asarray(cashflows.amounts, dtype= float) for cashflows in cashflows_list])
+
+        days = np.maximum((dates - np.datetime64(date, "D")).astype(int), 0)
+        discount_factors = self._get_discount_factor_grid(curve= curve, date= date, max_day= days.max())
+        present_values = amounts * discount_factors[days]
+
+        # Sum by stream (reduceat on the start of each non empty stream)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        results = np.zeros(len(cashflows_list), dtype= float)
+        results[lengths > 0] = np.add.reduceat(present_values, starts[lengths > 0])
+        return results
+
+    def compute_price(self, bond_position : BondPositionCalculator, curve : ZeroCurve, date : datetime.datetime):
+        return self.compute_prices(bond_positions= [bond_position], curve= curve, date= date)[0]
+
+    def compute_prices(self, bond_positions : "list[BondPositionCalculator]", curve : ZeroCurve, date : datetime.datetime):
+        """Clean prices of every position (0 at or after maturity), sharing one discount factor grid."""
+        cashflows_list = [
+            self.bond_cashflow_service.compute_future_cashflows(bond_position= bond_position, date= date)
+            if date < bond_position.bond.maturity_date else Cashflows(dates= [], amounts= [])
+            for bond_position in bond_positions
+        ]
+        return self.compute_cashflows_present_values(cashflows_list= cashflows_list, curve= curve, date= date)
@@ -1,18 +1,22 @@
 from abc import ABC, abstractmethod
-import pandas as pd
 import numpy as np
 import datetime
-from dateutil.relativedelta import relativedelta
 from collections import OrderedDict
 import logging
+from utils.lazy_import import lazy_import
 
 from classes.cashflows import Cashflows
 from services.service import Service
 from calculators.bond_position import BondPositionCalculator
+from utils.dependencies import dependency_tracker
 
+pd = lazy_import("pandas")
 
 
 class AbstractInflationService(Service, ABC):
+    # True when cashflows of bonds without inflation_index are adjusted too
+    adjusts_non_indexed_bonds = False
+
     @abstractmethod
     def compute_adjusted_cashflows(self,
             bond_position : BondPositionCalculator,
@@ -21,17 +25,26 @@ class AbstractInflationService(Service, ABC):
         ) -> Cashflows:
         ...
 
+    def dependencies(self, bond) -> tuple:
+        """Dependency keys (see utils.dependencies) of the inflation data the adjusted cashflows of bond are computed from."""
+        return ()
+
 class NoInflationService(AbstractInflationService):
     def compute_adjusted_cashflows(self, bond_position : BondPositionCalculator, cashflows : Cashflows, computation_date: datetime.datetime):
         return cashflows
 
 class ForcedFixedInflationService(AbstractInflationService):
+    adjusts_non_indexed_bonds = True
     _warning_logged = False
     _error_message = lambda computation_date : f"""
 Please provide an inflation coefficient at date {computation_date} or before.
 You can set it this way : 
 bond_position_calculator.inflation_coefficients = {{}} # Set up
 bond_position_calculator.inflation_coefficients[date] = ... # Add inflation coefficient"""
+    def dependencies(self, bond):
+        inflation_coefficients = getattr(bond, "inflation_coefficients", None)
+        return () if inflation_coefficients is None else (inflation_coefficients.dependency,)
+
     def compute_adjusted_cashflows(self, bond_position : BondPositionCalculator, cashflows : Cashflows, computation_date: datetime.datetime):
         assert cashflows.dates[0] >= np.datetime64(computation_date), "One or several cashflow are before the computation_date. We can not apply fixed inflation ratio."
         # return bond_position.bond.inflation_coefficients[computation_date] * cashflows
@@ -53,12 +66,21 @@ bond_position_calculator.inflation_coefficients[date] = ... # Add inflation coef
 
 class RecomputeWithAvailableInflationService(AbstractInflationService):
     """Inflation Service will freeze the inflation index in the futures"""
-    def __init__(self, inflation_series : dict[str, pd.Series]):
+    def __init__(self, inflation_series : "dict[str, pd.Series]"):
         self.inflation_series = inflation_series
         for index, inflation_serie in inflation_series.items():
             self.inflation_series[index] = inflation_serie.asfreq("1ME", method ="ffill") # Make it monthly (end of the month)
 
-    def _compute_RQIs(self, dates : pd.DatetimeIndex, inflation_serie : pd.Series):
+    def dependencies(self, bond):
+        return () if bond.inflation_index is None else (("inflation_serie", self, bond.inflation_index),)
+
+    def update_inflation_serie(self, index : str, inflation_prints : "pd.Series"):
+        """Adds new prints (or revisions) of an index : only the results computed from this index are recomputed."""
+        inflation_serie = inflation_prints.combine_first(self.inflation_series[index]) if index in self.inflation_series else inflation_prints
+        self.inflation_series[index] = inflation_serie.asfreq("1ME", method ="ffill")
+        dependency_tracker.invalidate(("inflation_serie", self, index))
+
+    def _compute_RQIs(self, dates : "pd.DatetimeIndex", inflation_serie : "pd.Series"):
         dates_month = dates + pd.offsets.DateOffset(days = 1) - pd.offsets.MonthBegin()
 
         date_m3 = dates_month - pd.offsets.DateOffset(months=2, days= 1)
@@ -85,6 +107,7 @@ class RecomputeWithAvailableInflationService(AbstractInflationService):
 
 class RecomputeWithPastInflationService(RecomputeWithAvailableInflationService):
     def compute_adjusted_cashflows(self, bond_position, cashflows, computation_date):
+        from dateutil.relativedelta import relativedelta
         index = bond_position.bond.inflation_index
         if index is None: return cashflows
 
@@ -95,4 +118,57 @@ class RecomputeWithPastInflationService(RecomputeWithAvailableInflationService):
         RQI_emission_date = self._compute_RQIs(dates = pd.Timestamp(bond_position.bond.emission_date), inflation_serie = past_inflation_series)
 
         return cashflows * (RQI_cashflows / RQI_emission_date)
-    
\ No newline at end of file
+    
+
+class SimulatedInflationPathsService(AbstractInflationService):
+    """
+    Inflation Service evaluating several simulated inflation paths at once (same RQI method as RecomputeWithAvailableInflationService).
+    inflation_paths[index] is a (paths x months) matrix of index values, months giving the month of each column.
+    compute_adjusted_cashflows only uses the reference_path (ex : to solve yield rates), compute_adjusted_amounts uses every path.
+    """
+    def __init__(self, months : np.ndarray, inflation_paths : dict[str, np.ndarray], reference_path = 0):
+        months = np.asarray(months).astype("datetime64[M]")
+        index_sorted = np.argsort(months)
+        self.months = months[index_sorted]
+        self.inflation_paths = {
+            index : np.atleast_2d(np.asarray(inflation_path, dtype= float))[:, index_sorted]
+            for index, inflation_path in inflation_paths.items()
+        }
+        self.nb_paths = max([len(inflation_path) for inflation_path in self.inflation_paths.values()], default= 1)
+        self.reference_path = reference_path
+
+    def _asof(self, months : np.ndarray, inflation_paths : np.ndarray):
+        # Pick last available month for every path
+        positions = np.searchsorted(self.months, months, side = "right") - 1
+        return np.where(positions >= 0, inflation_paths[:, np.maximum(positions, 0)], np.nan)
+
+    def _compute_RQIs(self, dates : np.ndarray, inflation_paths : np.ndarray):
+        dates = np.asarray(dates).astype("datetime64[D]")
+        dates_month = dates.astype("datetime64[M]")
+
+        days = (dates - dates_month.astype("datetime64[D]")).astype(float) + 1
+        days_in_month = ((dates_month + 1).astype("datetime64[D]") - dates_month.astype("datetime64[D]")).astype(float)
+
+        indice_m3 = self._asof(dates_month - 3, inflation_paths) # Pick last available for month -3
+        indice_m2 = self._asof(dates_month - 2, inflation_paths) # Pick last available for month -2
+        return indice_m3 + (indice_m2 - indice_m3) * days / days_in_month
+
+    def compute_RQI_ratios(self, bond_position : BondPositionCalculator, dates : np.ndarray, inflation_paths : np.ndarray):
+        """Returns the (paths x dates) RQI ratios between dates and the emission date of the bond."""
+        RQI_dates = self._compute_RQIs(dates = dates, inflation_paths = inflation_paths)
+        RQI_emission_date = self._compute_RQIs(dates = [np.datetime64(bond_position.bond.emission_date)], inflation_paths = inflation_paths)
+        return RQI_dates / RQI_emission_date
+
+    def compute_adjusted_amounts(self, bond_position : BondPositionCalculator, cashflows : Cashflows, computation_date: datetime.datetime):
+        """Returns the (paths x cashflows) adjusted amounts of every inflation path."""
+        index = bond_position.bond.inflation_index
+        if index is None: return np.broadcast_to(cashflows.amounts, (self.nb_paths, len(cashflows)))
+
+        return cashflows.amounts[None, :] * self.compute_RQI_ratios(bond_position= bond_position, dates= cashflows.dates, inflation_paths= self.inflation_paths[index])
+
+    def compute_adjusted_cashflows(self, bond_position : BondPositionCalculator, cashflows : Cashflows, computation_date: datetime.datetime):
+        index = bond_position.bond.inflation_index
+        if index is None: return cashflows
+
+        reference_inflation_path = self.inflation_paths[index][[self.reference_path]]
+        return cashflows * self.compute_RQI_ratios(bond_position= bond_position, dates= cashflows.dates, inflation_paths= reference_inflation_path)[0]
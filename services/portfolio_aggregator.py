@@ -0,0 +1,77 @@
+import datetime
+import threading
+import numpy as np
+from utils.lazy_import import lazy_import
+
+from classes.bond_position import BondPosition
+from services.service import Service
+from services.portfolio_executor import GroupedPortfolioExecutor
+from services.amortization import _snapshot_columns
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from factories.amortization.amortization import AbstractAmortizationFactory
+
+pd = lazy_import("pandas")
+
+
+class IncrementalPortfolioAggregator(Service):
+    """
+    Portfolio totals at date grouped by (issuer, inflation index), maintained trade by trade.
+    Each new position is valued once (calculator of the factory, batch kernel of its amortization service) and its contribution is added
+    to the totals of its group. Cancels and amendments retract the stored contribution of the trade : the book is never valued again.
+    """
+    def __init__(self, factory : "AbstractAmortizationFactory", date : datetime.datetime, measures = ("amortized_price", "amortization")):
+        unknown_measures = [measure for measure in measures if measure not in _snapshot_columns]
+        if len(unknown_measures) > 0: raise ValueError(f"Unknown measure(s) {unknown_measures}, available : {_snapshot_columns}")
+
+        self.factory = factory
+        self.date = date
+        self.measures = list(measures)
+        self.executor = GroupedPortfolioExecutor()
+        self._contributions = {} # trade_id : (group, measures values)
+        self._totals = {} # group : [nb positions, measures totals]
+        self._lock = threading.Lock()
+
+    def add(self, trade_id, bond_position : BondPosition): self.add_many({trade_id : bond_position})
+    def amend(self, trade_id, bond_position : BondPosition): self.add_many({trade_id : bond_position})
+
+    def add_many(self, trades : "dict[object, BondPosition]"):
+        """Values a batch of trades {trade_id : position} at once. A trade_id already aggregated is amended (its old contribution is retracted)."""
+        if len(trades) == 0: return
+        calculators = [self.factory.create_bond_position_calculator(bond_position) for bond_position in trades.values()]
+        values = self.executor.compute_snapshots(bond_positions= calculators, date= self.date)[self.measures].values
+
+        with self._lock:
+            for (trade_id, bond_position), trade_values in zip(trades.items(), values):
+                self._retract(trade_id)
+                group = (bond_position.bond.issuer, bond_position.bond.inflation_index)
+                self._contributions[trade_id] = (group, trade_values)
+                totals = self._totals.setdefault(group, [0, np.zeros(len(self.measures))])
+                totals[0] += 1
+                totals[1] += trade_values
+
+    def cancel(self, trade_id):
+        with self._lock:
+            if trade_id not in self._contributions: raise KeyError(f"Unknown trade {trade_id}")
+            self._retract(trade_id)
+
+    def _retract(self, trade_id):
+        if trade_id not in self._contributions: return
+        group, trade_values = self._contributions.pop(trade_id)
+        totals = self._totals[group]
+        totals[0] -= 1
+        totals[1] -= trade_values
+        if totals[0] == 0: del self._totals[group] # No rounding residue left in empty groups
+
+    def __len__(self): return len(self._contributions)
+
+    @property
+    def totals(self):
+        """One row per (issuer, inflation_index) : number of positions and total of each measure."""
+        with self._lock: rows = [(group, nb_positions, values.copy()) for group, (nb_positions, values) in self._totals.items()]
+        index = pd.MultiIndex.from_tuples([group for group, _, _ in rows], names= ["issuer", "inflation_index"])
+        data = np.array([values for _, _, values in rows], dtype= float).reshape(len(rows), len(self.measures))
+        totals = pd.DataFrame(data, index= index, columns= self.measures)
+        totals.insert(0, "nb_positions", [nb_positions for _, nb_positions, _ in rows])
+        return totals
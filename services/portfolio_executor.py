@@ -0,0 +1,60 @@
+import datetime
+import time
+import numpy as np
+from utils.lazy_import import lazy_import
+
+from calculators.bond_position import BondPositionCalculator
+from services.service import Service
+from services.amortization import ActuarialAmortizationService, _snapshot_columns
+from utils.metrics import metrics
+
+pd = lazy_import("pandas")
+
+_risk_measure_columns = ["price", "macaulay_duration", "modified_duration", "convexity"]
+
+
+class GroupedPortfolioExecutor(Service):
+    """
+    Values a heterogeneous portfolio (positions bound by any factories) partition by partition.
+    A partition gathers the positions sharing (amortization service, time convention, accrued coupon service, inflation service) :
+    it is valued by one call to the batch kernel of its amortization service, results are scattered back in the original order.
+    """
+    def partition(self, bond_positions : "list[BondPositionCalculator]"):
+        """Returns {(amortization service, time convention service, accrued coupon service, inflation service) : positions indexes}."""
+        partitions = {}
+        for i, bond_position in enumerate(bond_positions):
+            amortization_service = bond_position.amortization_service
+            key = (
+                amortization_service,
+                bond_position.bond.time_convention_service,
+                amortization_service.bond_cashflow_service.accrued_coupon_service,
+                bond_position.bond.inflation_service,
+            )
+            partitions.setdefault(key, []).append(i)
+        return {key : np.array(indexes, dtype= int) for key, indexes in partitions.items()}
+
+    def _run(self, bond_positions : list, columns : list, kernel, run : str):
+        start = time.perf_counter()
+        results = pd.DataFrame(np.full((len(bond_positions), len(columns)), np.nan), columns= columns)
+        for (amortization_service, *_), indexes in self.partition(bond_positions).items():
+            partition_results = kernel(amortization_service, [bond_positions[i] for i in indexes])
+            if partition_results is not None: results.iloc[indexes] = partition_results[columns].values
+        if metrics.enabled: metrics.record_run(run= run, nb_positions= len(bond_positions), elapsed= time.perf_counter() - start)
+        return results
+
+    def compute_snapshots(self, bond_positions : "list[BondPositionCalculator]", date : datetime.datetime):
+        """Every valuation measure of every position at date : one row per position (same order)."""
+        return self._run(
+            bond_positions= bond_positions, columns= _snapshot_columns, run= "snapshots",
+            kernel= lambda amortization_service, positions : amortization_service.compute_portfolio_snapshots(bond_positions= positions, date= date),
+        )
+
+    def compute_risk_measures(self, bond_positions : "list[BondPositionCalculator]", date : datetime.datetime):
+        """Risk measures of every position at date (same order). Only defined for actuarial amortization (nan otherwise)."""
+        return self._run(
+            bond_positions= bond_positions, columns= _risk_measure_columns, run= "risk_measures",
+            kernel= lambda amortization_service, positions : (
+                amortization_service.compute_portfolio_risk_measures(bond_positions= positions, date= date)
+                if isinstance(amortization_service, ActuarialAmortizationService) else None
+            ),
+        )
@@ -0,0 +1,186 @@
+import os
+import sys
+import stat
+import socket
+import socketserver
+import struct
+import datetime
+import argparse
+import importlib
+import numpy as np
+
+from services.service import Service
+from utils.lazy_import import lazy_import
+
+pd = lazy_import("pandas")
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from classes.bond_position import BondPosition
+    from factories.amortization.amortization import AbstractAmortizationFactory
+
+# Binary protocol (little endian). Every message is prefixed by its length (uint32).
+# Request  : opcode (uint8), position id length (uint16), nb values (uint32), position id (utf-8), values (int64)
+#            values are dates in seconds since epoch, or the interval in seconds for PROFILE
+# Response : status (uint8), nb values (uint32), then
+#            OK    : values (float64) ; for PROFILE dates (int64) followed by values (float64)
+#            ERROR : message (utf-8) of nb values bytes
+AMORTIZATION, AMORTIZED_PRICE, YIELD_RATE, PROFILE = 1, 2, 3, 4
+OK, ERROR = 0, 1
+
+_length_struct = struct.Struct("<I")
+_request_struct = struct.Struct("<BHI")
+_response_struct = struct.Struct("<BI")
+_epoch = datetime.datetime(1970, 1, 1)
+
+
+def _to_seconds(dates : list): return np.array(dates, dtype= "datetime64[s]").astype(np.int64)
+def _from_seconds(seconds : np.ndarray): return [_epoch + datetime.timedelta(seconds= int(second)) for second in seconds]
+
+def _send_message(connection : socket.socket, message : bytes):
+    connection.sendall(_length_struct.pack(len(message)) + message)
+
+def _receive_exactly(connection : socket.socket, size : int):
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = connection.recv(size - len(buffer))
+        if not chunk: raise ConnectionError("Connection closed")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+def _receive_message(connection : socket.socket):
+    size, = _length_struct.unpack(_receive_exactly(connection, _length_struct.size))
+    return _receive_exactly(connection, size)
+
+
+class PricingDaemon(Service):
+    """
+    Long-lived process keeping bond position calculators (service caches and solved yields) warm,
+    answering queries over a Unix domain socket. Each client connection is served by its own thread.
+    """
+    def __init__(self, factory : "AbstractAmortizationFactory", bond_positions : "dict[str, BondPosition]", socket_path : str, warm_up = True):
+        self.socket_path = socket_path
+        self.calculators = {
+            str(position_id) : factory.create_bond_position_calculator(bond_position= bond_position)
+            for position_id, bond_position in bond_positions.items()
+        }
+        if warm_up:
+            for calculator in self.calculators.values():
+                if hasattr(calculator, "_yield_rate_service"): calculator.compute_yield_rate()
+        self._server = None
+
+    def handle_request(self, request : bytes):
+        try:
+            # Malformed frames (truncated header, id or values) get an ERROR response too
+            opcode, position_id_length, nb_values = _request_struct.unpack_from(request)
+            offset = _request_struct.size
+            position_id = request[offset : offset + position_id_length].decode()
+            values = np.frombuffer(request, dtype= "<i8", count= nb_values, offset= offset + position_id_length)
+
+            if position_id not in self.calculators: raise KeyError(f"Unknown position {position_id}")
+            calculator = self.calculators[position_id]
+            if opcode == YIELD_RATE:
+                results = np.array([calculator.compute_yield_rate()], dtype= "<f8")
+            elif opcode == PROFILE:
+                # A null or negative interval would never reach the maturity
+                if len(values) < 1 or values[0] <= 0: raise ValueError("PROFILE needs a strictly positive interval (seconds)")
+                profile = calculator.compute_amortization_profile(interval= datetime.timedelta(seconds= int(values[0])))
+                payload = _to_seconds(list(profile.index)).astype("<i8").tobytes() + profile.values.astype("<f8").tobytes()
+                return _response_struct.pack(OK, len(profile)) + payload
+            elif opcode in (AMORTIZATION, AMORTIZED_PRICE):
+                measure = "amortization" if opcode == AMORTIZATION else "amortized_price"
+                results = calculator.compute_snapshots(dates= _from_seconds(values))[measure].values.astype("<f8")
+            else: raise ValueError(f"Unknown opcode {opcode}")
+        except Exception as exception:
+            message = f"{exception.__class__.__name__}: {exception}".encode()
+            return _response_struct.pack(ERROR, len(message)) + message
+        return _response_struct.pack(OK, len(results)) + results.tobytes()
+
+    def serve_forever(self):
+        daemon = self
+        class _Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                while True:
+                    try: request = _receive_message(self.request)
+                    except ConnectionError: return
+                    _send_message(self.request, daemon.handle_request(request))
+
+        self._remove_socket_file() # Left by a previous daemon that did not exit cleanly
+        self._server = socketserver.ThreadingUnixStreamServer(self.socket_path, _Handler)
+        self._server.daemon_threads = True
+        try: self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._remove_socket_file()
+
+    def _remove_socket_file(self):
+        # Only a socket is removed : any other file at socket_path makes the bind fail instead of being deleted
+        try:
+            if stat.S_ISSOCK(os.stat(self.socket_path).st_mode): os.unlink(self.socket_path)
+        except FileNotFoundError: pass
+
+    def shutdown(self):
+        if self._server is not None: self._server.shutdown()
+
+
+class PricingDaemonClient:
+    """Small client of PricingDaemon : keeps one connection open and decodes responses into numpy arrays."""
+    def __init__(self, socket_path : str):
+        self.socket_path = socket_path
+        self._connection = None
+
+    def _query(self, opcode : int, position_id : str, values : np.ndarray):
+        if self._connection is None:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try: connection.connect(self.socket_path)
+            except OSError:
+                connection.close()
+                raise
+            self._connection = connection # Only kept once connected : a failed connection is retried by the next query
+
+        position_id = str(position_id).encode()
+        values = np.asarray(values, dtype= "<i8")
+        _send_message(self._connection, _request_struct.pack(opcode, len(position_id), len(values)) + position_id + values.tobytes())
+
+        response = _receive_message(self._connection)
+        status, nb_values = _response_struct.unpack_from(response)
+        payload = response[_response_struct.size:]
+        if status == ERROR: raise RuntimeError(payload.decode())
+        return nb_values, payload
+
+    def compute_amortization(self, position_id : str, dates : list):
+        _, payload = self._query(AMORTIZATION, position_id, _to_seconds(dates))
+        return np.frombuffer(payload, dtype= "<f8")
+
+    def compute_amortized_price(self, position_id : str, dates : list):
+        _, payload = self._query(AMORTIZED_PRICE, position_id, _to_seconds(dates))
+        return np.frombuffer(payload, dtype= "<f8")
+
+    def compute_yield_rate(self, position_id : str):
+        _, payload = self._query(YIELD_RATE, position_id, [])
+        return float(np.frombuffer(payload, dtype= "<f8")[0])
+
+    def compute_amortization_profile(self, position_id : str, interval = datetime.timedelta(days = 1)):
+        nb_values, payload = self._query(PROFILE, position_id, [int(interval.total_seconds())])
+        dates = np.frombuffer(payload, dtype= "<i8", count= nb_values).astype("datetime64[s]")
+        values = np.frombuffer(payload, dtype= "<f8", count= nb_values, offset= 8 * nb_values)
+        return pd.Series(index= dates, data= values)
+
+    def close(self):
+        if self._connection is not None: self._connection.close()
+        self._connection = None
+
+
+if __name__ == "__main__":
+    # python -m services.pricing_daemon my_module:load_universe /tmp/actuarial.sock
+    # load_universe() must return (factory, {position_id : bond_position})
+    parser = argparse.ArgumentParser(description= "Warm pricing daemon over a Unix domain socket")
+    parser.add_argument("universe", help= "module:function returning (factory, {position_id : bond_position})")
+    parser.add_argument("socket_path")
+    arguments = parser.parse_args()
+
+    module_name, function_name = arguments.universe.split(":")
+    factory, bond_positions = getattr(importlib.import_module(module_name), function_name)()
+    daemon = PricingDaemon(factory= factory, bond_positions= bond_positions, socket_path= arguments.socket_path)
+    print(f"Serving {len(daemon.calculators)} positions on {arguments.socket_path}", file= sys.stderr)
+    daemon.serve_forever()
@@ -2,17 +2,49 @@ from abc import ABC, abstractmethod
 import numpy as np
 import copy
 import datetime
-import pandas as pd
-from dateutil import tz
-from dateutil.relativedelta import relativedelta
+import threading
+from collections import OrderedDict
 
 from services.service import Service
+from utils.lazy_import import lazy_import
+from settings import small_lru_cache_size
+
+pd = lazy_import("pandas")
+
+class SolveTelemetry:
+    """Telemetry of one solve (see AbstractSolver.solve_with_telemetry)."""
+    __slots__ = ("solver", "start_at", "root", "residual", "iterations", "evaluations", "max_iteration_reached")
+
+    def __init__(self, solver : str):
+        self.solver = solver
+        self.start_at = self.root = self.residual = None
+        self.iterations = self.evaluations = 0
+        self.max_iteration_reached = False
+
+    def __repr__(self):
+        return f"<SolveTelemetry({self.solver} : {self.iterations} iterations, {self.evaluations} evaluations, residual={self.residual}, start_at={self.start_at}, root={self.root})>"
+
 
 class AbstractSolver(Service, ABC):
     @abstractmethod
-    def solve(self, equation_function):
+    def solve(self, equation_function, start_at=None, telemetry : SolveTelemetry = None):
+        """start_at is an estimate of the root (solvers without starting point ignore it). telemetry is filled when given."""
         ...
 
+    def solve_with_telemetry(self, equation_function, start_at=None):
+        """Returns (root, SolveTelemetry) : iterations, equation evaluations, final residual, max_iteration reached, starting point and root."""
+        telemetry = SolveTelemetry(solver= self.__class__.__name__)
+        def counted_equation_function(x):
+            telemetry.evaluations += 1
+            return equation_function(x)
+        return self.solve(counted_equation_function, start_at= start_at, telemetry= telemetry), telemetry
+
+    def _record(self, telemetry : SolveTelemetry, start_at, root, residual, iterations : int, converged = True):
+        if telemetry is not None:
+            telemetry.start_at, telemetry.root, telemetry.residual = start_at, root, (float(abs(residual)) if residual is not None else None)
+            telemetry.iterations, telemetry.max_iteration_reached = iterations, not converged
+        return root
+
 class SolverNewtonRaphsonStandard(AbstractSolver):
     def __init__(
         self,
@@ -34,16 +66,16 @@ class SolverNewtonRaphsonStandard(AbstractSolver):
         derivation = (upper_evaluation - lower_evaluation) / self.epsilon_derivation
         return derivation
 
-    def solve(self, equation_function, start_at=None):
-        x = self.default_start_at if start_at is None else start_at
+    def solve(self, equation_function, start_at=None, telemetry : SolveTelemetry = None):
+        x = start = self.default_start_at if start_at is None else start_at
         f_x = equation_function(x)
+        # Already a root (ex : exact warm start)
+        if np.abs(f_x) < self.precision: return self._record(telemetry, start_at= start, root= x, residual= f_x, iterations= 0)
+        converged = False
         for i in range(self.max_iteration):
             derivation = self.derivation(x, equation_function=equation_function, f_x=f_x)
             assert abs(derivation) >= 1E-7, "Cannot perform derivation."
-            new_x = (
-                -f_x / self.derivation(x, equation_function=equation_function, f_x=f_x)
-                + x
-            )
+            new_x = -f_x / derivation + x
 
             f_new_x = equation_function(new_x)
             deviation = np.abs(f_new_x)
@@ -52,13 +84,14 @@ class SolverNewtonRaphsonStandard(AbstractSolver):
             f_x = f_new_x
 
             if deviation < self.precision:
+                converged = True
                 break
         if self.verbose:
-            if i == self.max_iteration - 1:
+            if not converged:
                 print(f"Max iterations reached : {i+1} with precision {deviation:1.2e}")
             else:
                 print(f"Nb iteration : {i+1} ; precision : {deviation:1.2e}")
-        return x
+        return self._record(telemetry, start_at= start, root= x, residual= f_x, iterations= i + 1, converged= converged)
 
 
 class SolverDichotomy(AbstractSolver):
@@ -70,7 +103,7 @@ class SolverDichotomy(AbstractSolver):
         self.lower_limit = lower_limit
         self.max_iteration = max_iteration
 
-    def solve(self, equation_function):
+    def solve(self, equation_function, start_at=None, telemetry : SolveTelemetry = None):
         upper = self.upper_limit
         lower = self.lower_limit
 
@@ -79,74 +112,183 @@ class SolverDichotomy(AbstractSolver):
             original_equation = copy.copy(equation_function)
             equation_function = lambda x: -original_equation(x)
 
+        converged = False
         for i in range(self.max_iteration):
             x = (upper + lower) / 2
-            if equation_function(x) > 0:
+            f_x = equation_function(x)
+            if f_x > 0:
                 upper = x
             else:
                 lower = x
 
             if (upper - lower) / 2 < self.precision:
+                converged = True
                 break
-        return (upper + lower) / 2
+        # Residual of the last evaluated middle (the root returned is within precision of it)
+        return self._record(telemetry, start_at= None, root= (upper + lower) / 2, residual= f_x, iterations= i + 1, converged= converged)
+
+
+class SolverBrent(AbstractSolver):
+    """
+    Bracketed hybrid root finder (Brent) : inverse quadratic interpolation and secant steps, bisection when they do not shrink
+    the bracket enough. Once a sign change is bracketed it always converges (no derivative needed), in a few evaluations.
+    The bracket is searched from start_at by expanding steps towards the root, without going below lower_limit.
+    """
+    def __init__(
+        self,
+        default_start_at=0.01,
+        initial_step=0.01,
+        warm_start_step=1e-4,
+        lower_limit=-1 + 1e-6,
+        precision=1e-6,
+        xtol=1e-12,
+        max_iteration=100,
+        max_expansion=60,
+    ):
+        self.default_start_at = default_start_at
+        self.initial_step = initial_step
+        self.warm_start_step = warm_start_step # start_at is an estimate : smaller first step
+        self.lower_limit = lower_limit
+        self.precision = precision
+        self.xtol = xtol
+        self.max_iteration = max_iteration
+        self.max_expansion = max_expansion
+
+    def bracket(self, equation_function, start_at=None):
+        """Returns (a, b, f(a), f(b)) with f(a) and f(b) of opposite signs (or one of them equal to 0)."""
+        a = self.default_start_at if start_at is None else start_at
+        b = a + (self.initial_step if start_at is None else self.warm_start_step)
+        f_a, f_b = equation_function(a), equation_function(b)
+        for _ in range(self.max_expansion):
+            if f_a * f_b <= 0: return a, b, f_a, f_b
+            # Expand on the side where the function is closer to 0
+            if abs(f_a) < abs(f_b) and a > self.lower_limit:
+                a, b, f_b = max(a - 1.6 * (b - a), self.lower_limit), a, f_a
+                f_a = equation_function(a)
+            else:
+                a, b, f_a = b, b + 1.6 * (b - a), f_b
+                f_b = equation_function(b)
+        raise ValueError(f"Cannot bracket a root : f({a}) = {f_a}, f({b}) = {f_b}")
+
+    def solve(self, equation_function, start_at=None, telemetry : SolveTelemetry = None):
+        start = self.default_start_at if start_at is None else start_at
+        a, b, f_a, f_b = self.bracket(equation_function, start_at= start_at)
+        if abs(f_a) < abs(f_b): a, b, f_a, f_b = b, a, f_b, f_a
+        c, f_c = a, f_a
+        d = e = b - a
+        for i in range(self.max_iteration):
+            if abs(f_b) < self.precision: return self._record(telemetry, start_at= start, root= b, residual= f_b, iterations= i)
+            # Keep the root bracketed between b and c, b being the best estimate
+            if (f_b > 0) == (f_c > 0):
+                c, f_c = a, f_a
+                d = e = b - a
+            if abs(f_c) < abs(f_b):
+                a, b, c = b, c, b
+                f_a, f_b, f_c = f_b, f_c, f_b
+
+            tolerance = 2 * np.finfo(float).eps * abs(b) + 0.5 * self.xtol
+            middle = 0.5 * (c - b)
+            if abs(middle) <= tolerance or f_b == 0: return self._record(telemetry, start_at= start, root= b, residual= f_b, iterations= i)
+
+            if abs(e) >= tolerance and abs(f_a) > abs(f_b):
+                s = f_b / f_a
+                if a == c: # Secant
+                    p, q = 2 * middle * s, 1 - s
+                else: # Inverse quadratic interpolation
+                    q, r = f_a / f_c, f_b / f_c
+                    p = s * (2 * middle * q * (q - r) - (b - a) * (r - 1))
+                    q = (q - 1) * (r - 1) * (s - 1)
+                if p > 0: q = -q
+                p = abs(p)
+                if 2 * p < min(3 * middle * q - abs(tolerance * q), abs(e * q)): e, d = d, p / q
+                else: d = e = middle # Bisection
+            else: d = e = middle # Bisection
+
+            a, f_a = b, f_b
+            b += d if abs(d) > tolerance else (tolerance if middle > 0 else -tolerance)
+            f_b = equation_function(b)
+        return self._record(telemetry, start_at= start, root= b, residual= f_b, iterations= self.max_iteration, converged= abs(f_b) < self.precision)
 
 
 class Interpolation2DEngine:
-    def __init__(self, X : list, Y : list):
-        self.X = np.array(list(map(self.convert, X)))
-        self.Y = np.array(Y)
-        self.index_sorted = np.argsort(X)
-
-        self.X = self.X[self.index_sorted]
-        self.Y = self.Y[self.index_sorted]
-
-        self.saved_values = {}
-
-    def convert(self, x):
-        if isinstance(x, datetime.date):
-            return datetime.datetime.timestamp(
-                datetime.datetime.combine(
-                    x,
-                    datetime.datetime.min.time(),
-                    tzinfo= tz.UTC
-                )
-            )
-        if isinstance(x, datetime.datetime):
-            x.tzinfo = tz.UTC
-            return datetime.datetime.timestamp(x)
-        if isinstance(x, np.datetime64):
-            x : np.datetime64
-            return pd.Timestamp(x).timestamp()
-        return x
+    """
+    Linear (or step) interpolation of Y over X. X can be numbers, dates, datetimes (naive ones taken as UTC) or datetime64.
+    Slopes of every segment are precomputed : interpolate takes a scalar or an array (one searchsorted for all the points).
+    Outside of [X[0], X[-1]], linear extrapolates the first / last segment and step keeps the first / last value.
+    """
+    def __init__(self, X : list, Y : list, kind = "linear"):
+        if kind not in ("linear", "step"): raise ValueError(f"Unknown interpolation kind {kind}")
+        if kind == "linear" and len(X) < 2: raise Exception("Please provide at least 2 points to interpolate linearly")
+        self.kind = kind
+        X = self.convert(X)
+        index_sorted = np.argsort(X, kind= "stable")
+        self.X = X[index_sorted]
+        self.Y = np.asarray(Y, dtype= float)[index_sorted]
+        with np.errstate(divide= "ignore", invalid= "ignore"):
+            self.slopes = np.diff(self.Y) / np.diff(self.X)
+
+    @staticmethod
+    def convert(x):
+        """Dates (date, datetime, datetime64) to seconds since epoch, numbers as floats."""
+        x = np.asarray(x)
+        if x.dtype == object: x = x.astype("datetime64[us]")
+        if x.dtype.kind == "M": return x.astype("datetime64[us]").astype(np.int64) / 1E6
+        return x.astype(float)
 
     def interpolate(self, x):
         x = self.convert(x)
-        right_index = np.searchsorted(self.X, x)
-        # from -inf to x[0]
-        if right_index <= 0:
-            right_index = 1
-        # from x[-1] to +inf
-        elif right_index >= len(self.X):
-            right_index = len(self.X) - 1
-        left_index = right_index - 1
-
-        alpha = (self.Y[right_index] - self.Y[left_index])/(self.X[right_index] - self.X[left_index])
-        beta = (self.X[right_index] * self.Y[left_index] - self.X[left_index] * self.Y[right_index])/(self.X[right_index] - self.X[left_index])
-        return alpha * x + beta
-
-def RQI_Interpolation(date : datetime.date, indice_df : pd.Series):
-    indice_df = indice_df.copy()
-    date_m3 = datetime.date(year=date.year, month=date.month, day = 1) - relativedelta(months=2) - datetime.timedelta(days = 1)
-    date_m2 = datetime.date(year=date.year, month=date.month, day = 1) - relativedelta(months=1) - datetime.timedelta(days = 1)
-    nb_days = (datetime.date(year=date.year, month=date.month, day = 1) + relativedelta(months=1) - datetime.date(year=date.year, month=date.month, day = 1)).days
-
-    to_string = lambda date : f"{date.year}&{date.month}"
-    # print(indice_df.index)
-    indice_df.index = indice_df.index.to_series().apply(to_string)
-    indice_m3 = indice_df.loc[to_string(date_m3)]
-    indice_m2 = indice_df.loc[to_string(date_m2)]
-
-    return round(indice_m3 + (indice_m2 - indice_m3) * (date.day - 1)/ nb_days, 5)
+        if self.kind == "step":
+            results = self.Y[np.clip(np.searchsorted(self.X, x, side= "right") - 1, 0, len(self.X) - 1)]
+        else:
+            segments = np.clip(np.searchsorted(self.X, x, side= "right") - 1, 0, len(self.slopes) - 1)
+            results = self.Y[segments] + self.slopes[segments] * (x - self.X[segments])
+        return results.item() if results.ndim == 0 else results
+
+
+class RQIInterpolationEngine:
+    """
+    RQI (reference index) at dates from a monthly index series : values of months M-3 and M-2 linearly interpolated on the day of the month.
+    Months and values of the series are extracted once : interpolate takes a date or an array of dates.
+    """
+    def __init__(self, indice_serie : "pd.Series"):
+        months = indice_serie.index.values.astype("datetime64[M]")
+        index_sorted = np.argsort(months, kind= "stable")
+        self.months = months[index_sorted]
+        self.values = np.asarray(indice_serie.values, dtype= float)[index_sorted]
+
+    def _at_months(self, months : np.ndarray):
+        positions = np.minimum(np.searchsorted(self.months, months), len(self.months) - 1)
+        missing = self.months[positions] != months
+        if np.any(missing): raise KeyError(f"No index value for month(s) {np.unique(months[missing])}")
+        return self.values[positions]
+
+    def interpolate(self, dates):
+        dates = np.asarray(dates).astype("datetime64[D]")
+        dates_month = dates.astype("datetime64[M]")
+        days = (dates - dates_month.astype("datetime64[D]")).astype(float) # Day of the month - 1
+        nb_days = ((dates_month + 1).astype("datetime64[D]") - dates_month.astype("datetime64[D]")).astype(float)
+
+        indice_m3 = self._at_months(dates_month - 3)
+        indice_m2 = self._at_months(dates_month - 2)
+        RQIs = np.round(indice_m3 + (indice_m2 - indice_m3) * days / nb_days, 5)
+        return RQIs.item() if RQIs.ndim == 0 else RQIs
+
+# id(series) : (series, engine). The series is kept alive with its engine : its id cannot be reused by another series while cached
+_RQI_engines = OrderedDict()
+_RQI_engines_lock = threading.Lock()
+
+def RQI_Interpolation(date : datetime.date, indice_df : "pd.Series"):
+    """
+    RQI at date (or dates). The engine of a series is built once and reused by the next calls with the same series object :
+    series are expected not to be modified in place (update_inflation_serie builds a new series, which gets its own engine).
+    """
+    with _RQI_engines_lock:
+        entry = _RQI_engines.get(id(indice_df))
+        if entry is not None and entry[0] is indice_df: _RQI_engines.move_to_end(id(indice_df))
+        else:
+            entry = _RQI_engines[id(indice_df)] = (indice_df, RQIInterpolationEngine(indice_serie= indice_df))
+            if len(_RQI_engines) > small_lru_cache_size: _RQI_engines.popitem(last= False)
+    return entry[1].interpolate(date)
 
 def main():
     equation_to_solve = lambda x: np.cos(x) - x**3
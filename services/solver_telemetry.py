@@ -0,0 +1,77 @@
+import threading
+from collections import deque
+import numpy as np
+from utils.lazy_import import lazy_import
+
+from calculators.bond_position import BondPositionCalculator
+from services.service import Service
+from services.solver import SolveTelemetry
+from utils.metrics import evaluation_buckets
+import settings
+
+pd = lazy_import("pandas")
+
+_telemetry_columns = [
+    "bond", "time_convention", "solver", "seed", "iterations", "evaluations", "residual", "max_iteration_reached", "start_at", "root", "start_error",
+]
+
+
+class SolverTelemetryService(Service):
+    """
+    Collects the telemetry of the yield solves (YieldRateService(solver_telemetry= ...)) : one record per solve with the bond
+    (security_id, else its fingerprint), its time convention, the solver, the warm start used (seed), iterations, evaluations,
+    final residual, max_iteration reached, starting point and root. The last max_records solves are kept.
+    histogram and summary aggregate them per bond / convention (or any column) to find the expensive positions, export writes them to CSV.
+    """
+    def __init__(self, max_records = settings.big_lru_cache_size):
+        self._records = deque(maxlen= max_records)
+        self._lock = threading.Lock()
+
+    def record(self, bond_position : BondPositionCalculator, telemetry : SolveTelemetry, seed = None):
+        bond = bond_position.bond
+        start_error = abs(telemetry.root - telemetry.start_at) if telemetry.start_at is not None and telemetry.root is not None else np.nan
+        record = (
+            bond.security_id if bond.security_id is not None else bond.fingerprint,
+            getattr(bond.time_convention, "name", str(bond.time_convention)),
+            telemetry.solver, seed, telemetry.iterations, telemetry.evaluations, telemetry.residual, telemetry.max_iteration_reached,
+            telemetry.start_at, telemetry.root, start_error,
+        )
+        with self._lock: self._records.append(record)
+
+    def __len__(self): return len(self._records)
+
+    def reset(self):
+        with self._lock: self._records.clear()
+
+    def to_frame(self):
+        """One row per solve (columns of _telemetry_columns)."""
+        with self._lock: records = list(self._records)
+        return pd.DataFrame(records, columns= _telemetry_columns)
+
+    def histogram(self, by = "time_convention", measure = "evaluations", buckets = evaluation_buckets):
+        """Number of solves per group (rows) and bucket of measure (columns, upper bounds, last one : above every bucket)."""
+        frame = self.to_frame()
+        bucket_indexes = np.searchsorted(np.asarray(buckets, dtype= float), frame[measure].values.astype(float), side= "left")
+        labels = [f"<={bound}" for bound in buckets] + [f">{buckets[-1]}"]
+        counts = pd.crosstab(frame[by], pd.Categorical([labels[i] for i in bucket_indexes], categories= labels))
+        counts = counts.reindex(columns= labels, fill_value= 0)
+        counts.columns.name = measure
+        return counts
+
+    def summary(self, by = "bond"):
+        """Per group : number of solves, mean / max evaluations, solves hitting max_iteration, worst residual, mean start error. Most expensive first."""
+        frame = self.to_frame()
+        summary = frame.groupby(by).agg(
+            solves= ("evaluations", "size"),
+            total_evaluations= ("evaluations", "sum"),
+            mean_evaluations= ("evaluations", "mean"),
+            max_evaluations= ("evaluations", "max"),
+            max_iteration_reached= ("max_iteration_reached", "sum"),
+            max_residual= ("residual", "max"),
+            mean_start_error= ("start_error", "mean"),
+        )
+        return summary.sort_values("total_evaluations", ascending= False)
+
+    def export(self, path : str):
+        """Writes every record to a CSV file."""
+        self.to_frame().to_csv(path, index= False)
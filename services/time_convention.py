@@ -9,12 +9,15 @@ from services.service import Service
 from calculators.bond_position import BondPositionCalculator
 
 class AbstractTimeConventionService(Service, ABC):
+    # True when year counts depend on the coupon schedule of the bond (not only on the dates)
+    schedule_dependent = False
+
     @abstractmethod
     def year_count(self, bond_position : BondPositionCalculator, from_dates: np.ndarray, to_dates: np.ndarray):
         ...
 
 
-class TimeConventionActActISDAService:
+class TimeConventionActActISDAService(AbstractTimeConventionService):
     """
     An optimized version of your Act/Act day count.
     """
@@ -45,6 +48,8 @@ class TimeConventionActActISDAService:
         return year_count_start + year_count_middle + year_count_end
 
 class TimeConventionActActICMAService(AbstractTimeConventionService):
+    schedule_dependent = True
+
     def __init__(self):
         self.time_convention_service_helper = TimeConventionExact365Service()
         self._frequencies_allowed = [0.5, 1, 2, 4, 12] # nb coupons per year
@@ -140,23 +145,23 @@ class Denominator365:
 
 class Numerator30:
     @classmethod
-    def day_count(self, bond_position : BondPositionCalculator, from_dates: np.ndarray, to_dates: np.ndarray):
+    def day_count(self, from_dates: np.ndarray, to_dates: np.ndarray):
         return (
             360 * (NumpyDateUtils.get_years(to_dates) - NumpyDateUtils.get_years(from_dates))
             + 30 * (NumpyDateUtils.get_months(to_dates) - NumpyDateUtils.get_months(from_dates))
             + (NumpyDateUtils.get_days(to_dates) - NumpyDateUtils.get_days(from_dates))
-        )
+        ).astype("timedelta64[D]") # Same unit as the denominators
 
 
 class Denominator360:
     @classmethod
-    def day_count(self, bond_position : BondPositionCalculator, from_dates: np.ndarray, to_dates: np.ndarray):
+    def day_count(self, from_dates: np.ndarray, to_dates: np.ndarray):
         return np.timedelta64(datetime.timedelta(days=360))
 
 
 class Numerator30E(Numerator30):
     @classmethod
-    def day_count(self, bond_position : BondPositionCalculator, from_dates: np.ndarray, to_dates: np.ndarray):
+    def day_count(self, from_dates: np.ndarray, to_dates: np.ndarray):
         from_dates = np.where(NumpyDateUtils.get_days(from_dates) == 31, from_dates - np.timedelta64(1, "D"), from_dates)
         to_dates = np.where(NumpyDateUtils.get_days(to_dates) == 31, to_dates - np.timedelta64(1, "D"), to_dates)
         return super().day_count(from_dates, to_dates)
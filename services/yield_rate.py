@@ -1,5 +1,9 @@
 from abc import ABC, abstractmethod
+import bisect
 import logging
+import datetime
+import threading
+import numpy as np
 
 from classes.bond import Bond
 from classes.bond_position import BondPosition
@@ -8,15 +12,44 @@ from calculators.bond_position import BondPositionCalculator
 from services.service import Service
 from services.solver import SolverNewtonRaphsonStandard
 from services.amortization import ActuarialAmortizationService
+from services.yield_store import SQLiteYieldStore, compute_yield_fingerprint
+from services.solver_telemetry import SolverTelemetryService
 
 from utils.lru_cache import lru_cache
 from utils.speed_analyser import step_timer
+from utils.metrics import metrics, timed, evaluation_buckets
 import settings
 
+# Yields of the price / yield grid used to estimate the yield of a position before solving
+_grid_yield_rates = np.array([-0.5, -0.2, -0.1, -0.05, -0.02] + [i / 100 for i in range(0, 21)] + [0.25, 0.3, 0.4, 0.5, 0.75, 1., 1.5, 2.])
+
+def _bond_date_cache_key(self, bond_position : BondPositionCalculator, date):
+    return (self, bond_position.bond, bond_position.bond.fingerprint, date)
+
+def _bond_dependencies(self, bond_position : BondPositionCalculator, date):
+    return bond_position.bond.dependencies + bond_position.bond.inflation_dependencies
+
+def _sibling_date(sibling): return sibling[0]
+
 class YieldRateService(Service):
-    
-    def __init__(self, solver = None, amortization_service = None) -> None:
+    """
+    Solves the yield rate of positions. With warm_start, each solve starts from an estimate : the yield already solved for a lot of the
+    same bond with a nearby acquisition date and price (sibling lot), else the inversion of a price / yield grid of the bond at that date.
+    statistics counts solves, equation evaluations and the estimates used. solver_telemetry records the telemetry of every solve.
+    """
+    def __init__(self, solver = None, amortization_service = None, yield_store : SQLiteYieldStore = None, warm_start = True,
+            sibling_max_days = 31, sibling_max_price_gap = 0.01, max_siblings = settings.small_lru_cache_size,
+            solver_telemetry : SolverTelemetryService = None) -> None:
         self.solver = solver if solver is not None else SolverNewtonRaphsonStandard()
+        self.yield_store = yield_store
+        self.solver_telemetry = solver_telemetry
+        self.warm_start = warm_start
+        self.sibling_max_days = sibling_max_days
+        self.sibling_max_price_gap = sibling_max_price_gap # Relative gap of the clean prices (per unit of nominal)
+        self.max_siblings = max_siblings # Solved yields kept per bond
+        self._solved_yields = {} # bond : [(date, unit price, yield rate)] sorted by date
+        self._lock = threading.Lock()
+        self.reset_statistics()
 
         if amortization_service is None:
             amortization_service = ActuarialAmortizationService()
@@ -24,6 +57,7 @@ class YieldRateService(Service):
         self.amortization_service = amortization_service
 
     # @lru_cache(maxsize= settings.big_lru_cache_size)
+    @timed("compute_yield_rate")
     def compute_yield_rate(self, bond_position : BondPositionCalculator):
         at_date = bond_position.acquisition_date
 
@@ -33,18 +67,83 @@ class YieldRateService(Service):
         if at_date >= bond_position.bond.maturity_date:
             return 0
         
+        # Yields of inflation linked bonds depend on inflation data : never persisted
+        use_yield_store = self.yield_store is not None and bond_position.bond.inflation_index is None
+        if use_yield_store:
+            fingerprint = compute_yield_fingerprint(bond_position= bond_position, yield_rate_service= self)
+            yield_rate = self.yield_store.get(fingerprint)
+            if yield_rate is not None: return yield_rate
 
+        # Trial yields are given explicitly : the position is never mutated so that it can be shared between threads
         def equation_to_solve(yield_rate):
-            bond_position._yield_rate = yield_rate
             return (
                 self.amortization_service.compute_amortized_price(
                     bond_position=bond_position,
                     date=at_date,
+                    yield_rate=yield_rate,
                 )
                 - bond_position.acquisition_clean_price 
             )
 
-        yield_rate =  self.solver.solve(equation_function=equation_to_solve)
+        start_at, seed = self.estimate_yield_rate(bond_position= bond_position, date= at_date) if self.warm_start else (None, None)
+        yield_rate, telemetry = self.solver.solve_with_telemetry(equation_function=equation_to_solve, start_at= start_at)
+        if use_yield_store: self.yield_store.set(fingerprint, yield_rate)
+        if metrics.enabled: metrics.observe("solver_evaluations", telemetry.evaluations, buckets= evaluation_buckets, solver= telemetry.solver)
+        if self.solver_telemetry is not None: self.solver_telemetry.record(bond_position= bond_position, telemetry= telemetry, seed= seed)
+
+        with self._lock:
+            self.statistics["solves"] += 1
+            self.statistics["evaluations"] += telemetry.evaluations
+            if seed is not None: self.statistics[f"{seed}_seeds"] += 1
+            if self.warm_start: self._add_sibling(bond= bond_position.bond, sibling= (at_date, bond_position.acquisition_clean_price / bond_position.nominal, yield_rate))
+        return yield_rate
+
+    def _add_sibling(self, bond : Bond, sibling : tuple):
+        # Once max_siblings are kept, the sibling closest in date to the new one is dropped : the kept lots stay spread over the dates
+        siblings = self._solved_yields.setdefault(bond, [])
+        index = bisect.bisect_left(siblings, sibling[0], key= _sibling_date)
+        siblings.insert(index, sibling)
+        if len(siblings) <= self.max_siblings: return
+        neighbours = [i for i in (index - 1, index + 1) if 0 <= i < len(siblings)]
+        del siblings[min(neighbours, key= lambda i : abs(siblings[i][0] - sibling[0]))]
+
+    def reset_statistics(self):
+        self.statistics = {"solves" : 0, "evaluations" : 0, "sibling_seeds" : 0, "grid_seeds" : 0}
+
+    def estimate_yield_rate(self, bond_position : BondPositionCalculator, date):
+        """Returns (estimated yield, "sibling" or "grid"), or (None, None) when no estimate is available."""
+        unit_price = bond_position.acquisition_clean_price / bond_position.nominal
+        max_gap = datetime.timedelta(days= self.sibling_max_days)
+        with self._lock:
+            # Only the lots within sibling_max_days are scanned
+            siblings = self._solved_yields.get(bond_position.bond, ())
+            start = bisect.bisect_left(siblings, date - max_gap, key= _sibling_date)
+            end = bisect.bisect_right(siblings, date + max_gap, key= _sibling_date)
+            candidates = [
+                sibling for sibling in siblings[start : end]
+                if abs((sibling[0] - date).days) <= self.sibling_max_days and abs(sibling[1] - unit_price) <= self.sibling_max_price_gap * abs(unit_price)
+            ]
+        if len(candidates) > 0:
+            return min(candidates, key= lambda sibling : (abs(sibling[0] - date), abs(sibling[1] - unit_price)))[2], "sibling"
+
+        if not isinstance(self.amortization_service, ActuarialAmortizationService): return None, None
+        unit_prices = self._compute_price_yield_grid(bond_position= bond_position, date= date)
+        valid = np.isfinite(unit_prices)
+        if valid.sum() < 2: return None, None
+        # Prices decrease with the yield : np.interp needs increasing prices
+        return float(np.interp(unit_price, unit_prices[valid][::-1], _grid_yield_rates[valid][::-1])), "grid"
 
+    @lru_cache(maxsize= settings.medium_lru_cache_size, key= _bond_date_cache_key, dependencies= _bond_dependencies)
+    def _compute_price_yield_grid(self, bond_position : BondPositionCalculator, date):
+        """Amortized prices per unit of nominal at each yield of _grid_yield_rates. Shared by every lot of the bond."""
+        with np.errstate(all= "ignore"):
+            return self.amortization_service.compute_amortized_prices_at_yields(bond_position= bond_position, date= date, yield_rates= _grid_yield_rates) / bond_position.nominal
 
-        return yield_rate
\ No newline at end of file
+    def prefetch(self, bond_positions : list):
+        """Loads in memory the stored yields of a portfolio with one query per chunk. Returns the number of yields found."""
+        if self.yield_store is None: return 0
+        fingerprints = [
+            compute_yield_fingerprint(bond_position= bond_position, yield_rate_service= self)
+            for bond_position in bond_positions if bond_position.bond.inflation_index is None
+        ]
+        return len(self.yield_store.get_many(fingerprints))
@@ -0,0 +1,78 @@
+import hashlib
+import sqlite3
+import threading
+
+from services.service import Service
+from calculators.bond_position import BondPositionCalculator
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from services.yield_rate import YieldRateService
+
+_fingerprint_version = 4
+# Solver settings changing the solved yield (tolerances, iteration limits, bounds) : the ones a solver defines are fingerprinted
+_solver_parameters = ("precision", "xtol", "max_iteration", "epsilon_derivation", "lower_limit", "upper_limit")
+
+def compute_yield_fingerprint(bond_position : BondPositionCalculator, yield_rate_service : "YieldRateService"):
+    """
+    Content fingerprint of everything the yield of a position depends on : bond schedule, nominal, acquisition date and price,
+    time convention (inflation coefficients included) and the services used to solve it (amortization, cashflow, accrued coupon, inflation, solver and its tolerances).
+    """
+    bond_cashflow_service = yield_rate_service.amortization_service.bond_cashflow_service
+    return hashlib.sha1(repr((
+        _fingerprint_version,
+        bond_position.fingerprint,
+        yield_rate_service.amortization_service.__class__.__name__,
+        bond_cashflow_service.__class__.__name__,
+        bond_cashflow_service.accrued_coupon_service.__class__.__name__,
+        bond_position.bond.inflation_service.__class__.__name__, # ex : ForcedFixedInflationService also scales non indexed bonds
+        yield_rate_service.solver.__class__.__name__,
+        tuple((name, getattr(yield_rate_service.solver, name)) for name in _solver_parameters if hasattr(yield_rate_service.solver, name)),
+    )).encode()).hexdigest()
+
+
+class SQLiteYieldStore(Service):
+    """
+    Persistent yield store (SQLite) keyed by compute_yield_fingerprint. Values read or written are also kept in memory.
+    Yields of inflation linked bonds depend on inflation data that is not fingerprinted : they are never stored.
+    """
+    def __init__(self, path : str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread= False)
+        with self._lock, self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS yield_rates (fingerprint TEXT PRIMARY KEY, yield_rate REAL NOT NULL)")
+        self._memory = {}
+
+    def get(self, fingerprint : str):
+        if fingerprint in self._memory: return self._memory[fingerprint]
+        with self._lock:
+            row = self._connection.execute("SELECT yield_rate FROM yield_rates WHERE fingerprint = ?", (fingerprint,)).fetchone()
+        if row is None: return None
+        self._memory[fingerprint] = row[0]
+        return row[0]
+
+    def get_many(self, fingerprints : list):
+        """Returns {fingerprint : yield_rate} of the stored fingerprints, loading them in memory."""
+        missing = [fingerprint for fingerprint in set(fingerprints) if fingerprint not in self._memory]
+        chunk_size = 500 # SQLite limits the number of query parameters
+        for i in range(0, len(missing), chunk_size):
+            chunk = missing[i : i + chunk_size]
+            with self._lock:
+                rows = self._connection.execute(
+                    f"SELECT fingerprint, yield_rate FROM yield_rates WHERE fingerprint IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+            self._memory.update(rows)
+        return {fingerprint : self._memory[fingerprint] for fingerprint in fingerprints if fingerprint in self._memory}
+
+    def set(self, fingerprint : str, yield_rate : float):
+        self.set_many({fingerprint : yield_rate})
+
+    def set_many(self, yield_rates : "dict[str, float]"):
+        yield_rates = {fingerprint : float(yield_rate) for fingerprint, yield_rate in yield_rates.items()}
+        with self._lock, self._connection:
+            self._connection.executemany("INSERT OR REPLACE INTO yield_rates VALUES (?, ?)", list(yield_rates.items()))
+        self._memory.update(yield_rates)
+
+    def close(self):
+        with self._lock: self._connection.close()
@@ -1,3 +1,9 @@
 big_lru_cache_size = 50_000
 medium_lru_cache_size = 1_000
-small_lru_cache_size = 100
\ No newline at end of file
+small_lru_cache_size = 100
+# Import time budget (seconds) of each factories.amortization.* module, measured in a fresh interpreter by utils/import_time.py
+import_time_budget = 0.25
+# Memory budget (bytes) of one bond position and of its calculator, measured with tracemalloc by utils/memory_usage.py
+memory_per_position_budget = 160
+# Prometheus style metrics of utils/metrics.py (instrumented calls only check this flag when disabled)
+metrics_enabled = False
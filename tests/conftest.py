@@ -0,0 +1,37 @@
+import os
+import sys
+import datetime
+import pytest
+
+# Modules are imported from the repository root (no package installation)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes.bond import Bond
+from classes.bond_position import BondPosition
+from classes.cashflows import Cashflows
+from classes.time_convention import TimeConvention
+from factories.bond.coupon import CouponFactory
+
+emission_date = datetime.datetime(2020, 1, 1)
+maturity_date = datetime.datetime(2030, 1, 1)
+
+
+def build_bond(coupon_rate = 5, time_convention = TimeConvention.ACT_ACT_ICMA, inflation_index = None, security_id = None, redemption = 100):
+    coupons = CouponFactory().create_coupons(coupon_rate= coupon_rate, emission_date= emission_date, maturity_date= maturity_date, frequency= CouponFactory.Frequency.YEARLY)
+    return Bond(
+        emission_date= emission_date, maturity_date= maturity_date, redemptions= Cashflows(dates= [maturity_date], amounts= [redemption]), coupons= coupons,
+        time_convention= time_convention, inflation_index= inflation_index, security_id= security_id,
+    )
+
+def build_position(bond = None, price = 98, acquisition_date = datetime.datetime(2022, 6, 1), nominal = 100_000):
+    return BondPosition(
+        bond= bond if bond is not None else build_bond(), nominal= nominal,
+        acquisition_date= acquisition_date, acquisition_clean_price= nominal * price / 100,
+    )
+
+
+@pytest.fixture
+def make_bond(): return build_bond
+
+@pytest.fixture
+def make_position(): return build_position
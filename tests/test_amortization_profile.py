@@ -0,0 +1,46 @@
+import datetime
+from dateutil.relativedelta import relativedelta
+import numpy as np
+import pytest
+
+from classes.time_convention import TimeConvention
+from services.accrued_coupon import ActuarialAccruedCouponService, NoAccruedCouponService
+from services.inflation import ForcedFixedInflationService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory, DailyCouponActuarialAmortizationFactory
+
+factories = [
+    ClassicActuarialAmortizationFactory(), ClassicActuarialAmortizationFactory(accrued_coupon_service= ActuarialAccruedCouponService()),
+    ClassicActuarialAmortizationFactory(accrued_coupon_service= NoAccruedCouponService()), DailyCouponActuarialAmortizationFactory(),
+]
+
+
+def _assert_profiles_match(position, interval):
+    profile = position.compute_amortization_profile(interval= interval)
+    brute_force = position.compute_amortization_profile(interval= interval, closed_form= False)
+    assert list(profile.index) == list(brute_force.index)
+    assert np.allclose(profile.values, brute_force.values, rtol= 1E-9, atol= 1E-6)
+
+
+@pytest.mark.parametrize("factory", factories)
+@pytest.mark.parametrize("time_convention", [TimeConvention.ACT_ACT_ICMA, TimeConvention.ACT_ACT_ISDA, TimeConvention.ACT_365])
+def test_closed_form_profile_matches_brute_force(make_bond, make_position, factory, time_convention):
+    position = factory.create_bond_position_calculator(make_position(make_bond(time_convention= time_convention), price= 93))
+    _assert_profiles_match(position, interval= datetime.timedelta(days= 17))
+
+
+def test_calendar_intervals_and_positions_below_par(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    for price in (80, 100, 112):
+        _assert_profiles_match(factory.create_bond_position_calculator(make_position(make_bond(), price= price)), interval= relativedelta(months= 1))
+
+
+def test_inflation_adjusted_positions_keep_the_date_by_date_profile(make_bond, make_position):
+    bond = make_bond()
+    bond.inflation_coefficients = {bond.emission_date : 1.1}
+    position = ClassicActuarialAmortizationFactory(inflation_service= ForcedFixedInflationService()).create_bond_position_calculator(make_position(bond))
+    _assert_profiles_match(position, interval= datetime.timedelta(days= 60))
+
+
+def test_profiles_after_maturity_are_empty(make_position):
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position(acquisition_date= datetime.datetime(2030, 6, 1)))
+    assert len(position.compute_amortization_profile(interval= datetime.timedelta(days= 30))) == 0
@@ -0,0 +1,35 @@
+import asyncio
+import datetime
+import pytest
+
+from services.async_pricing import AsyncPricingService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+dates = [datetime.datetime(2023, 1, 1) + datetime.timedelta(days= 30 * k) for k in range(5)]
+
+
+def test_concurrent_requests_are_coalesced_and_each_caller_gets_its_value(make_bond, make_position):
+    positions = [make_position(make_bond(security_id= f"ASYNC{i}"), price= 95 + i) for i in range(3)]
+    service = AsyncPricingService(factory= ClassicActuarialAmortizationFactory())
+    batches = []
+    compute_batch = service.compute_batch
+    service.compute_batch = lambda requests : batches.append(len(requests)) or compute_batch(requests)
+    requests = [(position, date) for position in positions for date in dates] * 2
+
+    async def price_all():
+        return await asyncio.gather(*[service.compute_amortized_price(position, date) for position, date in requests])
+    results = asyncio.run(price_all())
+
+    assert batches == [len(positions) * len(dates)] # Duplicated requests are valued once
+    factory = ClassicActuarialAmortizationFactory()
+    for result, (position, date) in zip(results, requests):
+        assert result == pytest.approx(factory.create_bond_position_calculator(position).compute_amortized_price(date), rel= 1E-9)
+
+
+def test_errors_are_raised_to_the_callers_of_the_failing_position(make_position):
+    service = AsyncPricingService(factory= ClassicActuarialAmortizationFactory())
+
+    async def price_unknown_measure():
+        return await service.compute(make_position(), dates[0], measure= "unknown")
+    with pytest.raises(KeyError):
+        asyncio.run(price_unknown_measure())
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from services.solver import SolverBrent, SolverNewtonRaphsonStandard
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+
+@pytest.mark.parametrize("equation_function, root", [
+    (lambda x : np.cos(x) - x ** 3, 0.865474033101614),
+    (lambda x : np.arctan(x - 3), 3.), # Newton overshoots from 0.01
+    (lambda x : (x - 0.05) ** 3, 0.05), # Flat at the root
+    (lambda x : np.exp(-x) - 0.5, np.log(2)),
+])
+def test_converges_on_bracketable_functions(equation_function, root):
+    solver = SolverBrent(precision= 1E-12)
+    assert solver.solve(equation_function) == pytest.approx(root, abs= 1E-4)
+    telemetry = solver.solve_with_telemetry(equation_function)[1]
+    assert not telemetry.max_iteration_reached and telemetry.evaluations < 100
+
+
+def test_no_sign_change_raises():
+    with pytest.raises(ValueError, match= "Cannot bracket"):
+        SolverBrent(max_expansion= 10).solve(lambda x : x ** 2 + 1)
+
+
+def test_never_evaluates_below_the_lower_limit():
+    evaluated = []
+    SolverBrent().solve(lambda x : evaluated.append(x) or 1 / (1 + x) - 50, start_at= 0.5)
+    assert min(evaluated) >= -1 + 1E-6
+
+
+@pytest.mark.parametrize("price", [5, 30, 98, 180])
+def test_yields_match_newton_including_deep_discounts(make_position, price):
+    yield_rate = lambda solver : ClassicActuarialAmortizationFactory(solver= solver).create_bond_position_calculator(make_position(price= price)).compute_yield_rate()
+    assert yield_rate(SolverBrent()) == pytest.approx(yield_rate(SolverNewtonRaphsonStandard()), abs= 1E-9)
@@ -0,0 +1,33 @@
+import os
+import datetime
+import numpy as np
+import pytest
+
+from services.closing_matrix import ClosingMatrixService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+dates = [datetime.datetime(2022, 12, 31), datetime.datetime(2023, 6, 30), datetime.datetime(2023, 12, 31)]
+
+
+def test_matrices_match_the_snapshots_of_each_position(tmp_path, make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    # 7 positions in chunks of 3, with duplicated lots
+    positions = [factory.create_bond_position_calculator(make_position(make_bond(security_id= f"CLOSE{i % 2}"), price= 95 + i % 3)) for i in range(7)]
+    directory = str(tmp_path / "close")
+
+    matrices = ClosingMatrixService(chunk_size= 3).compute_closing_matrices(bond_positions= positions, dates= dates, directory= directory,
+        measures= ("amortization", "amortized_price", "accrued_coupon"))
+
+    for measure, matrix in matrices.items():
+        assert matrix.shape == (len(positions), len(dates)) and not matrix.flags.writeable
+        expected = np.array([position.compute_snapshots(dates)[measure].values for position in positions])
+        assert np.allclose(matrix, expected, rtol= 1E-12)
+        assert np.array_equal(np.load(os.path.join(directory, f"{measure}.npy"), mmap_mode= "r"), matrix)
+    assert np.load(os.path.join(directory, "dates.npy")).tolist() == dates
+
+
+def test_unknown_measures_and_empty_portfolios(tmp_path):
+    service = ClosingMatrixService()
+    with pytest.raises(ValueError, match= "Unknown measure"):
+        service.compute_closing_matrices(bond_positions= [], dates= dates, directory= str(tmp_path), measures= ("duration",))
+    assert service.compute_closing_matrices(bond_positions= [], dates= dates, directory= str(tmp_path))["amortization"].shape == (0, len(dates))
@@ -0,0 +1,59 @@
+import datetime
+import numpy as np
+import pytest
+
+from classes.zero_curve import ZeroCurve
+from classes.time_convention import TimeConvention
+from services.curve_pricing import CurvePricingService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+dates = [datetime.datetime(2022, 6, 1), datetime.datetime(2024, 3, 15), datetime.datetime(2029, 12, 31)]
+
+
+def _pricing(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    positions = [factory.create_bond_position_calculator(make_position(make_bond(time_convention= TimeConvention.ACT_365, coupon_rate= rate), price= price))
+        for rate, price in ((5, 98), (2, 90))]
+    return factory, CurvePricingService(bond_cashflow_service= factory.bond_cashflow_service), positions
+
+
+def test_flat_curve_gives_the_amortized_price_at_its_rate(make_bond, make_position):
+    factory, service, positions = _pricing(make_bond, make_position)
+    for position in positions:
+        yield_rate = position.compute_yield_rate()
+        curve = ZeroCurve(tenors= [1., 30.], zero_rates= [yield_rate, yield_rate])
+        for date in dates:
+            expected = factory.amortization_service.compute_amortized_price(bond_position= position, date= date, yield_rate= yield_rate)
+            assert service.compute_price(bond_position= position, curve= curve, date= date) == pytest.approx(expected, rel= 1E-9)
+    assert service.compute_price(bond_position= positions[0], curve= curve, date= datetime.datetime(2030, 1, 1)) == 0
+
+
+def test_batch_prices_match_single_prices_and_the_curve_shape_matters(make_bond, make_position):
+    _, service, positions = _pricing(make_bond, make_position)
+    upward = ZeroCurve(tenors= [0.5, 2., 10.], zero_rates= [0.01, 0.02, 0.04])
+    flat = ZeroCurve(tenors= [5.], zero_rates= [0.03])
+
+    prices = service.compute_prices(bond_positions= positions, curve= upward, date= dates[1])
+    assert prices == pytest.approx([service.compute_price(bond_position= position, curve= upward, date= dates[1]) for position in positions], rel= 1E-12)
+    assert not np.allclose(prices, service.compute_prices(bond_positions= positions, curve= flat, date= dates[1]))
+
+
+def test_new_and_edited_curves_get_their_own_grid(make_bond, make_position):
+    _, service, positions = _pricing(make_bond, make_position)
+    low_price = service.compute_price(bond_position= positions[0], curve= ZeroCurve(tenors= [5.], zero_rates= [0.02]), date= dates[1])
+    high_rate = ZeroCurve(tenors= [5.], zero_rates= [0.06]) # Possibly at the address of the previous curve
+    assert service.compute_price(bond_position= positions[0], curve= high_rate, date= dates[1]) < low_price
+
+    price = service.compute_price(bond_position= positions[0], curve= high_rate, date= dates[1])
+    high_rate.zero_rates[0] = 0.02 # Edited in place
+    assert service.compute_price(bond_position= positions[0], curve= high_rate, date= dates[1]) == pytest.approx(low_price, rel= 1E-12)
+    assert price != pytest.approx(low_price)
+
+
+def test_cashflows_beyond_the_horizon_extend_the_grid(make_bond, make_position):
+    factory, _, positions = _pricing(make_bond, make_position)
+    service = CurvePricingService(bond_cashflow_service= factory.bond_cashflow_service, horizon= datetime.timedelta(days= 30))
+    yield_rate = positions[0].compute_yield_rate()
+    curve = ZeroCurve(tenors= [1.], zero_rates= [yield_rate])
+    expected = factory.amortization_service.compute_amortized_price(bond_position= positions[0], date= dates[1], yield_rate= yield_rate)
+    assert service.compute_price(bond_position= positions[0], curve= curve, date= dates[1]) == pytest.approx(expected, rel= 1E-9)
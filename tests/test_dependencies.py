@@ -0,0 +1,86 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.dependencies import DependencyTracker
+from services.inflation import ForcedFixedInflationService, RecomputeWithAvailableInflationService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+date = datetime.datetime(2024, 3, 1)
+months = pd.date_range("2019-01-31", "2030-12-31", freq= "ME")
+
+
+def _inflation_serie(growth):
+    return pd.Series(100 * (1 + growth) ** np.arange(len(months)), index= months)
+
+
+def _fresh(position, inflation_service = None):
+    # Position valued by a new factory (no cached result)
+    return ClassicActuarialAmortizationFactory(inflation_service= inflation_service).create_bond_position_calculator(position)
+
+
+def test_only_results_of_invalidated_inputs_are_recomputed():
+    tracker, computations = DependencyTracker(), []
+    compute = lambda name : lambda : computations.append(name) or len(computations)
+    entries = {name : tracker.get_or_compute(None, dependencies= lambda name= name : (name,), compute= compute(name))[0] for name in ("a", "b")}
+
+    tracker.invalidate("a")
+    for name in ("a", "b"): entries[name], _ = tracker.get_or_compute(entries[name], dependencies= lambda name= name : (name,), compute= compute(name))
+    assert computations == ["a", "b", "a"]
+    assert tracker.get_or_compute(entries["a"], dependencies= lambda : ("a",), compute= compute("a"))[1] == 3 # Same generation : kept
+
+
+def test_schedule_writes_and_position_updates_are_seen(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    bond = make_bond(security_id= "TRACKED")
+    position = factory.create_bond_position_calculator(make_position(bond))
+    other = factory.create_bond_position_calculator(make_position(make_bond(security_id= "UNTOUCHED")))
+    yield_rate, price, other_price = position.compute_yield_rate(), position.compute_amortized_price(date), other.compute_amortized_price(date)
+
+    bond.coupons.loc[bond.coupons.dates[-1]] = 10_000.
+    assert position.compute_yield_rate() != pytest.approx(yield_rate)
+    assert position.compute_yield_rate() == pytest.approx(_fresh(make_position(bond)).compute_yield_rate(), rel= 1E-12)
+    assert position.compute_amortized_price(date) != pytest.approx(price)
+    assert other.compute_amortized_price(date) == other_price
+
+    position.update(acquisition_clean_price= 90_000.)
+    assert position.compute_yield_rate() == pytest.approx(_fresh(make_position(bond, price= 90)).compute_yield_rate(), rel= 1E-12)
+
+
+def test_inflation_coefficient_updates_are_seen(make_bond, make_position):
+    bond = make_bond(security_id= "COEFFICIENTS")
+    bond.inflation_coefficients = {bond.emission_date : 1.}
+    position = ClassicActuarialAmortizationFactory(inflation_service= ForcedFixedInflationService()).create_bond_position_calculator(make_position(bond))
+    price = position.compute_amortized_price(date)
+
+    bond.inflation_coefficients[datetime.datetime(2023, 1, 1)] = 1.2
+    assert position.compute_amortized_price(date) != pytest.approx(price)
+    assert position.compute_amortized_price(date) == pytest.approx(_fresh(make_position(bond), ForcedFixedInflationService()).compute_amortized_price(date), rel= 1E-12)
+
+
+def test_inflation_serie_updates_recompute_the_bonds_of_that_index(make_bond, make_position):
+    inflation_service = RecomputeWithAvailableInflationService(inflation_series= {"CPI" : _inflation_serie(0.001), "HICP" : _inflation_serie(0.002)})
+    factory = ClassicActuarialAmortizationFactory(inflation_service= inflation_service)
+    cpi, hicp = [factory.create_bond_position_calculator(make_position(make_bond(inflation_index= index, security_id= index))) for index in ("CPI", "HICP")]
+    cpi_price, hicp_price = cpi.compute_amortized_price(date), hicp.compute_amortized_price(date)
+    solves = factory.yield_rate_service.statistics["solves"]
+
+    revised_prints = _inflation_serie(0.004)[months <= "2023-12-31"]
+    inflation_service.update_inflation_serie("CPI", revised_prints)
+    assert cpi.compute_amortized_price(date) != pytest.approx(cpi_price)
+    assert hicp.compute_amortized_price(date) == hicp_price
+    assert factory.yield_rate_service.statistics["solves"] == solves + 1 # Only the CPI yield is solved again
+
+    expected_serie = revised_prints.combine_first(_inflation_serie(0.001))
+    expected = _fresh(make_position(make_bond(inflation_index= "CPI")), RecomputeWithAvailableInflationService(inflation_series= {"CPI" : expected_serie}))
+    assert cpi.compute_amortized_price(date) == pytest.approx(expected.compute_amortized_price(date), rel= 1E-12)
+
+
+def test_updated_bonds_stay_in_their_hash_buckets(make_bond, make_position):
+    bond = make_bond()
+    position = make_position(bond)
+    bonds, positions = {bond : "kept"}, {position : "kept"}
+    bond.coupons.loc[bond.coupons.dates[0]] = 1.
+    assert bonds[bond] == "kept" and bond == bond
+    assert positions[position] == "kept"
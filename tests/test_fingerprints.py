@@ -0,0 +1,56 @@
+import datetime
+import numpy as np
+
+from classes.security import Security
+from classes.cashflows import Cashflows
+from utils.dedupe import dedupe
+
+date = datetime.datetime(2023, 3, 1)
+
+
+def test_identical_content_shares_the_fingerprint(make_bond, make_position):
+    assert make_bond().fingerprint == make_bond(security_id= "OTHER_ID").fingerprint
+    assert make_bond().fingerprint != make_bond(coupon_rate= 6).fingerprint
+    assert make_position().fingerprint == make_position().fingerprint
+    assert make_position().fingerprint != make_position(price= 99).fingerprint
+
+    cashflows = Cashflows(dates= [date], amounts= [1.])
+    assert cashflows.fingerprint == Cashflows(dates= [date], amounts= [1.]).fingerprint
+    fingerprint = cashflows.fingerprint
+    cashflows.loc[date] = 2.
+    assert cashflows.fingerprint != fingerprint
+
+
+def test_fingerprint_follows_content_updates(make_bond):
+    bond = make_bond()
+    fingerprint = bond.fingerprint
+    bond.coupons.loc[bond.coupons.dates[0]] = 50.
+    assert bond.fingerprint != fingerprint
+    fingerprint = bond.fingerprint
+    bond.inflation_coefficients = {bond.emission_date : 1.1}
+    assert bond.fingerprint != fingerprint
+
+
+def test_hash_and_eq_stay_consistent_when_the_content_changes(make_bond):
+    bond, twin = make_bond(), make_bond()
+    assert bond == twin and hash(bond) == hash(twin)
+    assert bond != make_bond(coupon_rate= 6)
+
+    bonds = {bond}
+    bond.coupons.loc[bond.coupons.dates[0]] = 50.
+    assert bond in bonds and bond == bond and hash(bond) == hash(twin) # Identity frozen at the first hash
+
+    assert make_bond(security_id= "X") == make_bond(coupon_rate= 6, security_id= "X")
+    assert make_bond(security_id= "X") != make_bond(security_id= "Y")
+    assert make_bond(security_id= "X") != make_bond()
+    assert (make_bond() == "X") is False
+    assert make_bond().__eq__("X") is NotImplemented
+    assert make_bond(security_id= "X") == Security(security_id= "X")
+
+
+def test_dedupe_maps_results_back():
+    items = ["a", "b", "a", "c", "b", "a"]
+    unique_items, inverse = dedupe(items, key= lambda item : item)
+    assert unique_items == ["a", "b", "c"]
+    assert list(np.array(unique_items)[inverse]) == items
+    assert dedupe([], key= lambda item : item)[0] == []
@@ -0,0 +1,51 @@
+import datetime
+import pytest
+
+from classes.cashflows import Cashflows
+from services.inflation import ForcedFixedInflationService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+date = datetime.datetime(2023, 3, 1)
+
+
+def _future_coupons(position):
+    return position.amortization_service.bond_cashflow_service.compute_future_coupons(bond_position= position, date= date).amounts
+
+
+def test_positions_of_a_security_share_one_bond_calculator(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    bond = make_bond(security_id= "FLY")
+    first, second = [factory.create_bond_position_calculator(make_position(bond, price= price)) for price in (95, 99)]
+
+    assert first.bond is second.bond
+    assert factory.create_bond_position_calculator(make_position(make_bond(security_id= "FLY"))).bond is first.bond # Same content
+    without_id = make_bond()
+    assert factory.create_bond_position_calculator(make_position(without_id)).bond is not factory.create_bond_position_calculator(make_position(without_id)).bond
+
+
+def test_a_new_bond_under_a_known_security_id_gets_its_own_values(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    low_coupon = factory.create_bond_position_calculator(make_position(make_bond(coupon_rate= 5, security_id= "SAME")))
+    high_coupon = factory.create_bond_position_calculator(make_position(make_bond(coupon_rate= 10, security_id= "SAME")))
+    fresh = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position(make_bond(coupon_rate= 10, security_id= "SAME")))
+
+    assert _future_coupons(low_coupon)[0] == 5_000
+    assert high_coupon.bond is not low_coupon.bond
+    assert _future_coupons(high_coupon)[0] == 10_000
+    assert high_coupon.compute_yield_rate() == pytest.approx(fresh.compute_yield_rate(), rel= 1E-12)
+
+
+def test_replaced_schedules_and_coefficients_are_used(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory(inflation_service= ForcedFixedInflationService())
+    bond = make_bond(security_id= "REPLACED")
+    bond.inflation_coefficients = {bond.emission_date : 1.}
+    position = factory.create_bond_position_calculator(make_position(bond))
+    position.compute_yield_rate()
+
+    bond.coupons = Cashflows(dates= bond.coupons.dates, amounts= bond.coupons.amounts * 2)
+    bond.inflation_coefficients = {bond.emission_date : 1.2}
+    rebuilt = factory.create_bond_position_calculator(make_position(bond))
+    fresh = ClassicActuarialAmortizationFactory(inflation_service= ForcedFixedInflationService()).create_bond_position_calculator(make_position(bond))
+
+    assert _future_coupons(rebuilt)[0] == pytest.approx(12_000)
+    assert rebuilt.compute_yield_rate() == pytest.approx(fresh.compute_yield_rate(), rel= 1E-12)
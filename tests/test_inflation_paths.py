@@ -0,0 +1,44 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.inflation import SimulatedInflationPathsService, RecomputeWithAvailableInflationService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+date = datetime.datetime(2024, 3, 1)
+months = np.arange(np.datetime64("2019-01"), np.datetime64("2031-01"))
+paths = 100 * np.cumprod(1 + np.random.default_rng(0).normal(0.002, 0.003, (4, len(months))), axis= 1)
+
+
+def _position(inflation_service, make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory(inflation_service= inflation_service)
+    return factory, factory.create_bond_position_calculator(make_position(make_bond(inflation_index= "CPI")))
+
+
+def test_each_path_matches_a_single_path_service(make_bond, make_position):
+    _, position = _position(SimulatedInflationPathsService(months= months, inflation_paths= {"CPI" : paths}), make_bond, make_position)
+    yield_rate = position.compute_yield_rate()
+
+    prices = position.compute_amortized_price_paths(date)
+
+    assert prices.shape == (len(paths),)
+    for i in range(len(paths)):
+        factory, single_path_position = _position(SimulatedInflationPathsService(months= months, inflation_paths= {"CPI" : paths[[i]]}), make_bond, make_position)
+        expected = factory.amortization_service.compute_amortized_price(bond_position= single_path_position, date= date, yield_rate= yield_rate)
+        assert prices[i] == pytest.approx(expected, rel= 1E-12)
+
+
+def test_reference_path_matches_the_inflation_serie_service(make_bond, make_position):
+    inflation_serie = pd.Series(paths[0], index= pd.DatetimeIndex(months.astype("datetime64[D]")) + pd.offsets.MonthEnd(0))
+    _, position = _position(SimulatedInflationPathsService(months= months, inflation_paths= {"CPI" : paths}), make_bond, make_position)
+    _, serie_position = _position(RecomputeWithAvailableInflationService(inflation_series= {"CPI" : inflation_serie}), make_bond, make_position)
+
+    assert position.compute_yield_rate() == pytest.approx(serie_position.compute_yield_rate(), rel= 1E-10)
+    assert position.compute_amortized_price_paths(date)[0] == pytest.approx(serie_position.compute_amortized_price(date), rel= 1E-10)
+
+
+def test_price_paths_need_a_paths_service(make_position):
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position())
+    with pytest.raises(ValueError):
+        position.compute_amortized_price_paths(date)
@@ -0,0 +1,62 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+
+from services import solver
+from services.solver import Interpolation2DEngine, RQIInterpolationEngine, RQI_Interpolation
+
+
+def _index_serie():
+    months = pd.date_range("2020-01-01", periods= 48, freq= "MS")
+    return pd.Series(data= 100 + np.arange(48) * 0.3 + np.sin(np.arange(48)), index= months)
+
+
+def test_linear_interpolation_matches_numpy_and_extrapolates():
+    X, Y = [3., 0., 1., 7.], [4., 1., 3., -2.] # Unsorted points
+    engine = Interpolation2DEngine(X, Y)
+    points = np.linspace(0, 7, 50)
+
+    assert np.allclose(engine.interpolate(points), np.interp(points, sorted(X), [1., 3., 4., -2.]))
+    assert engine.interpolate(1.5) == pytest.approx(3.25)
+    assert engine.interpolate(-1.) == pytest.approx(-1.) # First segment extended
+    assert engine.interpolate(8.) == pytest.approx(-3.5)
+
+
+def test_step_interpolation_and_dates():
+    dates = [datetime.date(2024, 1, 1), datetime.date(2024, 1, 11)]
+    step = Interpolation2DEngine(dates, [1., 2.], kind= "step")
+    assert step.interpolate([datetime.date(2023, 1, 1), datetime.date(2024, 1, 5), datetime.date(2025, 1, 1)]).tolist() == [1., 1., 2.]
+
+    linear = Interpolation2DEngine(dates, [0., 10.])
+    assert linear.interpolate(datetime.datetime(2024, 1, 3, 12)) == pytest.approx(2.5)
+    assert linear.interpolate(np.datetime64("2024-01-06")) == pytest.approx(5.)
+
+    with pytest.raises(ValueError): Interpolation2DEngine(dates, [0., 1.], kind= "cubic")
+    with pytest.raises(Exception): Interpolation2DEngine(dates[:1], [0.])
+
+
+def test_RQI_matches_the_monthly_formula():
+    serie = _index_serie()
+    engine = RQIInterpolationEngine(serie)
+    dates = [datetime.date(2021, 3, 1), datetime.date(2021, 3, 16), datetime.date(2022, 2, 28), datetime.date(2023, 4, 30)]
+
+    for date in dates:
+        month = pd.Timestamp(date.year, date.month, 1)
+        m3, m2 = serie[month - pd.DateOffset(months= 3)], serie[month - pd.DateOffset(months= 2)]
+        expected = round(m3 + (m2 - m3) * (date.day - 1) / month.days_in_month, 5)
+        assert engine.interpolate(date) == pytest.approx(expected, abs= 1E-9)
+    assert engine.interpolate(dates).tolist() == [engine.interpolate(date) for date in dates]
+    with pytest.raises(KeyError): engine.interpolate(datetime.date(2020, 2, 1))
+
+
+def test_RQI_engine_is_built_once_per_series():
+    serie = _index_serie()
+    RQI_Interpolation(datetime.date(2021, 3, 16), serie)
+    engine = solver._RQI_engines[id(serie)][1]
+    RQI_Interpolation(datetime.date(2021, 5, 16), serie)
+    assert solver._RQI_engines[id(serie)][1] is engine
+
+    updated = serie * 2 # A new series object gets its own engine
+    assert RQI_Interpolation(datetime.date(2021, 3, 16), updated) == pytest.approx(2 * RQI_Interpolation(datetime.date(2021, 3, 16), serie), abs= 1E-4)
+    assert solver._RQI_engines[id(updated)][1] is not engine
@@ -0,0 +1,23 @@
+import os
+import sys
+import subprocess
+
+from classes.time_convention import TimeConvention
+from factories.time_convention import TimeConventionFactory
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_factories_does_not_load_pandas_nor_time_conventions():
+    # Fresh interpreter : the test session itself has already loaded pandas
+    code = (
+        "import sys, factories.amortization.actuarial, factories.amortization.linear, factories.amortization.full\n"
+        "print(any(name in sys.modules for name in ('pandas.core.frame', 'dateutil.relativedelta', 'services.time_convention')))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd= root, capture_output= True, text= True, check= True).stdout
+    assert output.strip() == "False"
+
+
+def test_time_convention_services_are_created_once_and_shared():
+    service = TimeConventionFactory().create_time_convention_service(time_convention= TimeConvention.ACT_365)
+    assert TimeConventionFactory().create_time_convention_service(time_convention= TimeConvention.ACT_365) is service
@@ -0,0 +1,54 @@
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+
+from classes.cashflows import Cashflows, merge_cashflows
+
+
+def _random_stream(rng, size):
+    # Dates drawn from a small range so that streams share dates (ties), each stream sorted and unique
+    days = np.sort(rng.choice(60, size= size, replace= False))
+    return np.datetime64("2024-01-01", "us") + days.astype("timedelta64[D]"), rng.normal(size= size)
+
+
+def _reference(streams):
+    series = pd.concat([pd.Series(data= amounts, index= dates, dtype= float) for dates, amounts in streams])
+    return series.groupby(level= 0).sum()
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_merge_matches_concat_and_groupby(seed):
+    rng = np.random.default_rng(seed)
+    streams = [_random_stream(rng, size) for size in rng.integers(0, 25, size= 4)]
+
+    merged = merge_cashflows(streams)
+    expected = _reference(streams)
+    assert np.array_equal(merged.dates, expected.index.values)
+    assert np.allclose(merged.amounts, expected.values)
+
+
+def test_same_dates_are_summed_and_a_single_stream_is_kept():
+    dates = np.array(["2024-01-01", "2024-06-01"], dtype= "datetime64[us]")
+    merged = merge_cashflows([(dates, [1., 2.]), (dates, [10., 20.]), (dates[1:], [100.])])
+    assert list(merged.dates) == list(dates)
+    assert list(merged.amounts) == [11., 122.]
+
+    single = merge_cashflows([(dates, [1., 2.])])
+    assert list(single.dates) == list(dates) and list(single.amounts) == [1., 2.]
+    assert len(merge_cashflows([(dates[:0], []), (dates[:0], [])])) == 0
+
+
+def test_cashflows_addition_and_add_cashflow():
+    first = Cashflows(dates= [datetime.datetime(2024, 1, 1), datetime.datetime(2025, 1, 1)], amounts= [1., 2.])
+    second = Cashflows(dates= [datetime.datetime(2024, 6, 1), datetime.datetime(2025, 1, 1)], amounts= [10., 20.])
+
+    added = first + second
+    assert list(added.amounts) == [1., 10., 22.]
+    assert added.root is added
+    assert list((first + 1).amounts) == [2., 3.]
+
+    extended = first.add_cashflow(datetime.datetime(2024, 3, 1), 5.)
+    assert list(extended.amounts) == [1., 5., 2.]
+    assert list(first.add_cashflow(datetime.datetime(2025, 1, 1), 5.).amounts) == [1., 7.]
+    assert len(first) == 2 # Unchanged
@@ -0,0 +1,67 @@
+import datetime
+import urllib.request
+import pytest
+
+from utils.metrics import MetricsRegistry, metrics
+from services.closing_matrix import ClosingMatrixService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+dates = [datetime.datetime(2023, 12, 31), datetime.datetime(2024, 12, 31)]
+
+
+@pytest.fixture
+def enabled_metrics():
+    enabled = metrics.enabled
+    metrics.enabled = True
+    metrics.reset()
+    yield metrics
+    metrics.enabled = enabled
+    metrics.reset()
+
+
+def _samples(rendered : str):
+    return dict(line.rsplit(" ", 1) for line in rendered.splitlines() if not line.startswith("#"))
+
+
+def test_render_uses_the_prometheus_text_format():
+    registry = MetricsRegistry(enabled= True, prefix= "test")
+    registry.increment("cache_requests_total", cache= "price", result= "hit")
+    registry.increment("cache_requests_total", 3, cache= "price", result= "miss")
+    registry.set("positions_per_second", 12.5, run= 'quoted "run"')
+    for value in (0.5, 2, 200): registry.observe("solver_evaluations", value, buckets= (1, 10))
+
+    rendered = registry.render()
+    samples = _samples(rendered)
+    assert "# TYPE test_solver_evaluations histogram" in rendered and "# TYPE test_cache_requests_total counter" in rendered
+    assert samples['test_cache_requests_total{cache="price",result="miss"}'] == "3"
+    assert float(samples['test_cache_hit_ratio{cache="price"}']) == 0.25
+    assert float(samples['test_positions_per_second{run="quoted \\"run\\""}']) == 12.5
+    assert [samples[f'test_solver_evaluations_bucket{{le="{bound}"}}'] for bound in (1, 10, "+Inf")] == ["1", "2", "3"] # Cumulated
+    assert float(samples["test_solver_evaluations_sum"]) == 202.5 and samples["test_solver_evaluations_count"] == "3"
+
+
+def test_runs_and_solves_are_recorded(tmp_path, enabled_metrics, make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    positions = [factory.create_bond_position_calculator(make_position(make_bond(security_id= f"METRICS{i}"), price= 95 + i)) for i in range(3)]
+    ClosingMatrixService().compute_closing_matrices(bond_positions= positions, dates= dates, directory= str(tmp_path))
+
+    samples = _samples(enabled_metrics.render())
+    assert samples['bond_amortization_positions_valued_total{run="closing_matrix"}'] == "3"
+    assert samples['bond_amortization_run_duration_seconds_count{run="closing_matrix"}'] == "1"
+    assert float(samples['bond_amortization_positions_per_second{run="closing_matrix"}']) > 0
+    assert samples['bond_amortization_solver_evaluations_count{solver="SolverNewtonRaphsonStandard"}'] == "3"
+    assert any(name.startswith("bond_amortization_call_duration_seconds_count") for name in samples)
+
+
+def test_write_and_serve(tmp_path):
+    registry = MetricsRegistry(enabled= True)
+    registry.increment("positions_valued_total", 2, run= "snapshots")
+    path = str(tmp_path / "metrics.prom")
+    registry.write(path)
+    with open(path) as file: assert file.read() == registry.render()
+
+    server = registry.serve(port= 0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_address[1]}/metrics") as response:
+            assert response.read().decode() == registry.render()
+    finally: server.shutdown()
@@ -0,0 +1,53 @@
+import pickle
+import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pytest
+
+from classes.bond import Bond
+from classes.bond_position import BondPosition
+from utils.shared_memory import SharedCashflowsBlock
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+date = datetime.datetime(2023, 3, 1)
+
+
+def _compute_amortized_price(bond_position):
+    return ClassicActuarialAmortizationFactory().create_bond_position_calculator(bond_position).compute_amortized_price(date)
+
+
+def test_round_trip_keeps_the_content(make_bond, make_position):
+    bond = make_bond(security_id= "PICKLE")
+    bond.inflation_coefficients = {bond.emission_date : 1.1}
+    position = make_position(bond)
+
+    restored = pickle.loads(pickle.dumps(position))
+    assert type(restored) is BondPosition and type(restored.bond) is Bond
+    assert restored.fingerprint == position.fingerprint
+    assert np.array_equal(restored.bond.coupons.dates, bond.coupons.dates)
+    assert restored.bond.inflation_coefficients[bond.emission_date] == 1.1
+    restored.bond.inflation_coefficients[bond.emission_date] = 1.2 # Still tracked once unpickled
+    assert restored.bond.fingerprint != bond.fingerprint
+
+
+def test_calculators_are_pickled_without_their_services(make_position):
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position())
+    position.compute_yield_rate()
+
+    restored = pickle.loads(pickle.dumps(position))
+    assert type(restored) is BondPosition and type(restored.bond) is Bond
+    assert _compute_amortized_price(restored) == pytest.approx(position.compute_amortized_price(date), rel= 1E-12)
+
+
+def test_shared_block_carries_locations_and_workers_get_the_same_values(make_bond, make_position):
+    positions = [make_position(make_bond(security_id= f"SHARED{i}", coupon_rate= 3 + i), price= 95 + i) for i in range(4)]
+    expected = [_compute_amortized_price(position) for position in positions]
+    private_size = len(pickle.dumps(positions[0].bond.coupons))
+
+    with SharedCashflowsBlock([position.bond for position in positions]) as block:
+        assert len(pickle.dumps(positions[0].bond.coupons)) < private_size
+        with ProcessPoolExecutor(max_workers= 2, mp_context= multiprocessing.get_context("fork")) as executor:
+            prices = list(executor.map(_compute_amortized_price, positions))
+    assert prices == pytest.approx(expected, rel= 1E-12)
+    assert len(pickle.dumps(positions[0].bond.coupons)) == private_size # Arrays carried again once the block is closed
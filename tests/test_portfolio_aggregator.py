@@ -0,0 +1,53 @@
+import datetime
+import numpy as np
+import pytest
+
+from services.portfolio_aggregator import IncrementalPortfolioAggregator
+from services.portfolio_executor import GroupedPortfolioExecutor
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+date = datetime.datetime(2024, 3, 1)
+measures = ["amortized_price", "amortization"]
+
+
+def _trade(make_bond, make_position, i, price = None):
+    bond = make_bond(security_id= f"AGG{i % 4}", coupon_rate= 2 + i % 4)
+    bond.issuer = f"ISSUER{i % 2}"
+    return make_position(bond, price= price if price is not None else 90 + i)
+
+
+def _full_recompute(factory, trades : dict):
+    # Values the whole book again and sums it by (issuer, inflation index)
+    calculators = [factory.create_bond_position_calculator(position) for position in trades.values()]
+    values = GroupedPortfolioExecutor().compute_snapshots(bond_positions= calculators, date= date)[measures]
+    values["issuer"] = [position.bond.issuer for position in trades.values()]
+    return values.groupby("issuer")[measures].sum()
+
+
+def test_totals_match_a_full_recompute_through_cancels_and_amendments(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    aggregator = IncrementalPortfolioAggregator(factory= factory, date= date, measures= measures)
+    trades = {i : _trade(make_bond, make_position, i) for i in range(10)}
+    aggregator.add_many({i : trades[i] for i in range(6)})
+    for i in range(6, 10): aggregator.add(i, trades[i])
+
+    aggregator.cancel(3)
+    del trades[3]
+    trades[5] = _trade(make_bond, make_position, 5, price= 101)
+    aggregator.amend(5, trades[5])
+
+    totals = aggregator.totals
+    expected = _full_recompute(factory, trades)
+    assert len(aggregator) == len(trades)
+    assert list(totals["nb_positions"]) == [sum(1 for i in trades if i % 2 == k) for k in range(2)]
+    assert np.allclose(totals[measures].values, expected.loc[[issuer for issuer, _ in totals.index]].values, rtol= 1E-12)
+
+
+def test_emptied_groups_are_dropped_and_unknown_trades_raise(make_bond, make_position):
+    aggregator = IncrementalPortfolioAggregator(factory= ClassicActuarialAmortizationFactory(), date= date)
+    aggregator.add("T", _trade(make_bond, make_position, 0))
+    aggregator.cancel("T")
+
+    assert len(aggregator) == 0 and len(aggregator.totals) == 0
+    with pytest.raises(KeyError): aggregator.cancel("T")
+    with pytest.raises(ValueError): IncrementalPortfolioAggregator(factory= ClassicActuarialAmortizationFactory(), date= date, measures= ("duration",))
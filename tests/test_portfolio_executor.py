@@ -0,0 +1,48 @@
+import datetime
+import numpy as np
+import pytest
+
+from classes.time_convention import TimeConvention
+from services.accrued_coupon import ActuarialAccruedCouponService
+from services.portfolio_executor import GroupedPortfolioExecutor
+from services.time_convention import TimeConvention30360Service, TimeConvention30E360Service
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+from factories.amortization.linear import LinearAmortizationFactory
+
+date = datetime.datetime(2024, 3, 1)
+time_conventions = [TimeConvention.ACT_ACT_ICMA, TimeConvention.ACT_ACT_ISDA, TimeConvention.ACT_365, TimeConvention.ACT_360, TimeConvention._30_360, TimeConvention._30E_360]
+
+
+def _mixed_portfolio(make_bond, make_position):
+    factories = [ClassicActuarialAmortizationFactory(), ClassicActuarialAmortizationFactory(accrued_coupon_service= ActuarialAccruedCouponService()), LinearAmortizationFactory()]
+    return [
+        factories[i % len(factories)].create_bond_position_calculator(make_position(make_bond(time_convention= time_convention, coupon_rate= 2 + i % 4), price= 92 + i))
+        for i, time_convention in enumerate(time_conventions * 3)
+    ]
+
+
+def test_snapshots_match_the_position_ones(make_bond, make_position):
+    positions = _mixed_portfolio(make_bond, make_position)
+    executor = GroupedPortfolioExecutor()
+    assert len(executor.partition(positions)) == len(time_conventions) # One partition per (factory, time convention) pair
+
+    snapshots = executor.compute_snapshots(bond_positions= positions, date= date)
+    for i, position in enumerate(positions):
+        expected = position.compute_snapshots([date]).iloc[0]
+        assert snapshots.iloc[i].values == pytest.approx(expected[snapshots.columns].values, rel= 1E-9, abs= 1E-9, nan_ok= True)
+
+
+def test_risk_measures_are_nan_outside_actuarial_amortization(make_bond, make_position):
+    positions = _mixed_portfolio(make_bond, make_position)
+    risk_measures = GroupedPortfolioExecutor().compute_risk_measures(bond_positions= positions, date= date)
+    for i, position in enumerate(positions):
+        if isinstance(position.amortization_service, type(positions[0].amortization_service)):
+            assert risk_measures.iloc[i]["price"] == pytest.approx(position.compute_risk_measures(date)["price"], rel= 1E-9)
+        else: assert np.isnan(risk_measures.iloc[i]).all()
+
+
+def test_30_360_year_counts():
+    from_dates = np.array(["2024-01-15", "2024-03-31", "2024-01-31"], dtype= "datetime64[D]")
+    to_dates = np.array(["2025-02-28", "2024-04-30", "2024-03-31"], dtype= "datetime64[D]")
+    assert TimeConvention30360Service().year_count(bond_position= None, from_dates= from_dates, to_dates= to_dates) == pytest.approx(np.array([403, 29, 60]) / 360)
+    assert TimeConvention30E360Service().year_count(bond_position= None, from_dates= from_dates, to_dates= to_dates) == pytest.approx(np.array([403, 30, 60]) / 360)
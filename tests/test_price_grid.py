@@ -0,0 +1,39 @@
+import datetime
+import numpy as np
+import pytest
+
+from services.accrued_coupon import ActuarialAccruedCouponService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+dates = [datetime.datetime(2022, 6, 1), datetime.datetime(2023, 3, 15), datetime.datetime(2027, 11, 30)]
+
+
+@pytest.mark.parametrize("accrued_coupon_service", [None, ActuarialAccruedCouponService()])
+def test_grid_matches_amortized_prices_at_each_yield(make_bond, make_position, accrued_coupon_service):
+    factory = ClassicActuarialAmortizationFactory(accrued_coupon_service= accrued_coupon_service)
+    position = factory.create_bond_position_calculator(make_position(make_bond()))
+    yield_rates = [0.01, 0.04, 0.08]
+
+    grid = position.compute_amortized_price_grid(dates= dates, yield_rates= yield_rates)
+
+    assert grid.shape == (len(yield_rates), len(dates))
+    for i, yield_rate in enumerate(yield_rates):
+        for j, date in enumerate(dates):
+            expected = factory.amortization_service.compute_amortized_price(bond_position= position, date= date, yield_rate= yield_rate)
+            assert grid[i, j] == pytest.approx(expected, rel= 1E-10)
+
+
+def test_zero_shift_gives_the_amortized_prices_of_the_position(make_bond, make_position):
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position(make_bond()))
+
+    grid = position.compute_amortized_price_grid(dates= dates, yield_shifts= [0.])
+
+    assert grid[0] == pytest.approx([position.compute_amortized_price(date) for date in dates], rel= 1E-10)
+
+
+def test_yield_rates_or_shifts_are_required(make_position):
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position())
+    with pytest.raises(ValueError):
+        position.compute_amortized_price_grid(dates= dates)
+    with pytest.raises(ValueError):
+        position.compute_amortized_price_grid(dates= dates, yield_rates= [0.01], yield_shifts= [0.])
@@ -0,0 +1,82 @@
+import os
+import socket
+import datetime
+import threading
+import numpy as np
+import pytest
+
+from services.pricing_daemon import (
+    PricingDaemon, PricingDaemonClient, _send_message, _receive_message, _request_struct, _response_struct, PROFILE, ERROR,
+)
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+dates = [datetime.datetime(2023, 1, 1), datetime.datetime(2025, 3, 15)]
+
+
+def _wait_listening(daemon : PricingDaemon):
+    # The server is listening once created by serve_forever
+    for _ in range(1000):
+        if daemon._server is not None: return
+        threading.Event().wait(0.01)
+    raise TimeoutError("The daemon did not start")
+
+
+@pytest.fixture
+def daemon(tmp_path, make_bond, make_position):
+    socket_path = str(tmp_path / "pricing.sock")
+    daemon = PricingDaemon(factory= ClassicActuarialAmortizationFactory(), bond_positions= {"P0" : make_position(make_bond(security_id= "DAEMON"))}, socket_path= socket_path)
+    thread = threading.Thread(target= daemon.serve_forever)
+    thread.start()
+    _wait_listening(daemon)
+    client = PricingDaemonClient(socket_path)
+    yield daemon, client
+    client.close()
+    daemon.shutdown()
+    thread.join()
+
+
+def _raw_query(client : PricingDaemonClient, request : bytes):
+    _send_message(client._connection, request)
+    response = _receive_message(client._connection)
+    status, nb_values = _response_struct.unpack_from(response)
+    return status, response[_response_struct.size:]
+
+
+def test_queries_match_the_calculator(daemon):
+    daemon, client = daemon
+    calculator = daemon.calculators["P0"]
+
+    assert client.compute_yield_rate("P0") == calculator.compute_yield_rate()
+    assert client.compute_amortized_price("P0", dates) == pytest.approx([calculator.compute_amortized_price(date) for date in dates], rel= 1E-12)
+    assert client.compute_amortization("P0", dates) == pytest.approx([calculator.compute_amortization(date) for date in dates], rel= 1E-9)
+    profile = client.compute_amortization_profile("P0", datetime.timedelta(days= 90))
+    assert profile.values == pytest.approx(calculator.compute_amortization_profile(interval= datetime.timedelta(days= 90)).values, rel= 1E-9)
+
+
+def test_errors_are_returned_as_error_frames(daemon):
+    _, client = daemon
+    with pytest.raises(RuntimeError, match= "Unknown position"):
+        client.compute_yield_rate("unknown")
+    # Malformed frames and invalid intervals : the connection stays usable
+    assert _raw_query(client, b"\x01\x05")[0] == ERROR
+    assert _raw_query(client, _request_struct.pack(1, 2, 5) + b"P0")[0] == ERROR
+    for interval in ([], [0], [-86400]):
+        status, message = _raw_query(client, _request_struct.pack(PROFILE, 2, len(interval)) + b"P0" + np.asarray(interval, dtype= "<i8").tobytes())
+        assert status == ERROR and b"interval" in message
+    assert client.compute_yield_rate("P0") > 0
+
+
+def test_socket_file_is_removed_and_a_stale_one_replaced(tmp_path, make_position):
+    socket_path = str(tmp_path / "stale.sock")
+    stale_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale_socket.bind(socket_path) # Left by a daemon that did not exit cleanly
+    stale_socket.close()
+
+    daemon = PricingDaemon(factory= ClassicActuarialAmortizationFactory(), bond_positions= {"P0" : make_position()}, socket_path= socket_path, warm_up= False)
+    thread = threading.Thread(target= daemon.serve_forever)
+    thread.start()
+    _wait_listening(daemon)
+    daemon.shutdown()
+    thread.join()
+
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,43 @@
+import datetime
+import numpy as np
+import pytest
+
+from classes.time_convention import TimeConvention
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+date = datetime.datetime(2024, 3, 1)
+
+
+def test_risk_measures_match_finite_differences_of_the_amortized_price(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    position = factory.create_bond_position_calculator(make_position(make_bond(time_convention= TimeConvention.ACT_365)))
+    yield_rate, step = position.compute_yield_rate(), 1E-5
+    price_at = lambda shift : factory.amortization_service.compute_amortized_price(bond_position= position, date= date, yield_rate= yield_rate + shift)
+    price, price_up, price_down = price_at(0), price_at(step), price_at(-step)
+
+    risk_measures = position.compute_risk_measures(date)
+
+    assert risk_measures["price"] == pytest.approx(position.compute_amortized_price(date), rel= 1E-10)
+    assert risk_measures["modified_duration"] == pytest.approx(- (price_up - price_down) / (2 * step) / price, rel= 1E-5)
+    assert risk_measures["macaulay_duration"] == pytest.approx(risk_measures["modified_duration"] * (1 + yield_rate), rel= 1E-12)
+    assert risk_measures["convexity"] == pytest.approx((price_up - 2 * price + price_down) / step ** 2 / price, rel= 1E-3)
+
+
+def test_portfolio_risk_measures_match_the_position_ones(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    bond = make_bond(security_id= "RISK")
+    positions = [factory.create_bond_position_calculator(make_position(bond, price= price)) for price in (95, 98, 95, 102)]
+
+    risk_measures = factory.amortization_service.compute_portfolio_risk_measures(bond_positions= positions, date= date)
+
+    assert len(risk_measures) == len(positions)
+    for (_, row), position in zip(risk_measures.iterrows(), positions):
+        expected = position.compute_risk_measures(date)
+        assert row.to_dict() == pytest.approx(expected, rel= 1E-10)
+
+
+def test_nothing_is_left_to_value_after_maturity(make_position):
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position())
+    risk_measures = position.compute_risk_measures(datetime.datetime(2031, 1, 1))
+    assert risk_measures["price"] == 0
+    assert np.isnan(risk_measures["modified_duration"])
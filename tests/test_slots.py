@@ -0,0 +1,46 @@
+import pickle
+import datetime
+import pytest
+
+from classes.bond import Bond
+from classes.cashflows import Cashflows
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+from utils.memory_usage import check_memory_per_position_budget
+
+date = datetime.datetime(2023, 3, 1)
+
+
+def test_no_instance_dict(make_bond, make_position):
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position(make_bond(security_id= "SLOTS")))
+    for instance in (position, position.bond, make_bond(), make_position(), position.bond.coupons):
+        assert not hasattr(instance, "__dict__"), type(instance).__name__
+
+
+def test_memory_per_position_is_within_budget():
+    over_budget, memory = check_memory_per_position_budget()
+    assert over_budget == {}, memory
+
+
+def test_calculator_reads_the_schedules_of_the_source_bond(make_bond, make_position):
+    bond = make_bond()
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position(bond))
+    previous_price = position.compute_amortized_price(date)
+
+    bond.coupons = Cashflows(dates= bond.coupons.dates, amounts= bond.coupons.amounts * 2)
+    assert position.bond.coupons is bond.coupons
+    assert position.compute_amortized_price(date) != pytest.approx(previous_price)
+    position.bond.redemptions = Cashflows(dates= bond.redemptions.dates, amounts= [110.])
+    assert bond.redemptions.amounts[0] == 110.
+
+
+def test_pickled_calculator_bond_is_a_plain_bond_with_the_current_schedules(make_bond, make_position):
+    bond = make_bond(security_id= "PICKLE")
+    position = ClassicActuarialAmortizationFactory().create_bond_position_calculator(make_position(bond))
+    bond.coupons = Cashflows(dates= bond.coupons.dates, amounts= bond.coupons.amounts * 2)
+    bond.inflation_coefficients = {bond.emission_date : 1.1}
+
+    restored = pickle.loads(pickle.dumps(position.bond))
+    assert type(restored) is Bond
+    assert list(restored.coupons.amounts) == list(bond.coupons.amounts)
+    assert dict(restored.inflation_coefficients) == {bond.emission_date : 1.1}
+    assert restored.security_id == "PICKLE" and restored.fingerprint == bond.fingerprint
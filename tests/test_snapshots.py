@@ -0,0 +1,30 @@
+import datetime
+import pytest
+
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory, DailyCouponActuarialAmortizationFactory
+
+dates = [datetime.datetime(2022, 1, 15), datetime.datetime(2023, 3, 1), datetime.datetime(2029, 12, 1), datetime.datetime(2031, 1, 1)]
+
+
+@pytest.mark.parametrize("factory", [ClassicActuarialAmortizationFactory(), DailyCouponActuarialAmortizationFactory()])
+def test_fused_snapshots_match_the_separate_measures(make_bond, make_position, factory):
+    position = factory.create_bond_position_calculator(make_position(make_bond()))
+
+    snapshots = position.compute_snapshots(dates)
+
+    for date in dates:
+        alive = date < position.bond.maturity_date
+        snapshot = snapshots.loc[date]
+        assert snapshot["amortization"] == pytest.approx(position.compute_amortization(date), rel= 1E-9, abs= 1E-6)
+        assert snapshot["amortized_price"] == pytest.approx(position.compute_amortized_price(date) if alive else 0, rel= 1E-9)
+        assert snapshot["yield_rate"] == position.compute_yield_rate()
+
+
+def test_portfolio_snapshots_match_the_position_ones(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    positions = [factory.create_bond_position_calculator(make_position(make_bond(), price= price)) for price in (95, 101)]
+
+    snapshots = factory.amortization_service.compute_portfolio_snapshots(bond_positions= positions, date= dates[1])
+
+    for (_, row), position in zip(snapshots.iterrows(), positions):
+        assert row.to_dict() == pytest.approx(position.compute_snapshot(dates[1]), rel= 1E-10)
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+from classes.time_convention import TimeConvention
+from services.solver import SolverBrent, SolverNewtonRaphsonStandard
+from services.solver_telemetry import SolverTelemetryService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+
+def _solve_book(make_bond, make_position, telemetry, solver = None):
+    factory = ClassicActuarialAmortizationFactory(solver= solver, solver_telemetry= telemetry)
+    bonds = [make_bond(security_id= "ICMA"), make_bond(time_convention= TimeConvention.ACT_365)]
+    for bond in bonds:
+        for price in (90, 95, 100):
+            factory.create_bond_position_calculator(make_position(bond, price= price)).compute_yield_rate()
+    return bonds
+
+
+def test_one_record_per_solve(make_bond, make_position):
+    telemetry = SolverTelemetryService()
+    bonds = _solve_book(make_bond, make_position, telemetry)
+    frame = telemetry.to_frame()
+
+    assert len(telemetry) == len(frame) == 6
+    assert set(frame["bond"]) == {"ICMA", bonds[1].fingerprint} # Fingerprint of the bond without security_id
+    assert list(frame["seed"]) == ["grid", "grid", "grid"] * 2 # Acquisition prices too far apart for sibling seeds
+    assert (frame["evaluations"] >= frame["iterations"]).all() and not frame["max_iteration_reached"].any()
+    assert (frame["residual"] < 1E-6).all()
+    assert frame["start_error"].values == pytest.approx((frame["root"] - frame["start_at"]).abs().values)
+
+
+def test_summary_histogram_and_export(tmp_path, make_bond, make_position):
+    telemetry = SolverTelemetryService()
+    _solve_book(make_bond, make_position, telemetry, solver= SolverBrent())
+    frame = telemetry.to_frame()
+
+    summary = telemetry.summary()
+    assert list(summary["solves"]) == [3, 3]
+    assert list(summary["total_evaluations"]) == sorted(frame.groupby("bond")["evaluations"].sum(), reverse= True)
+
+    histogram = telemetry.histogram(buckets= (2, 5))
+    assert list(histogram.columns) == ["<=2", "<=5", ">5"]
+    assert histogram.values.sum() == len(frame)
+    assert list(histogram.sum(axis= 1)) == [3, 3]
+
+    path = str(tmp_path / "telemetry.csv")
+    telemetry.export(path)
+    assert len(pd.read_csv(path)) == len(frame)
+
+
+def test_records_are_bounded_and_reset(make_bond, make_position):
+    telemetry = SolverTelemetryService(max_records= 4)
+    _solve_book(make_bond, make_position, telemetry, solver= SolverNewtonRaphsonStandard())
+    assert len(telemetry) == 4
+    telemetry.reset()
+    assert len(telemetry) == 0 and len(telemetry.to_frame()) == 0
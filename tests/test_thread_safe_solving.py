@@ -0,0 +1,37 @@
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+from services.accrued_coupon import ActuarialAccruedCouponService
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+dates = [datetime.datetime(2023, 1, 1) + datetime.timedelta(days= 90 * k) for k in range(8)]
+
+
+def test_solving_never_mutates_the_position(make_position):
+    factory = ClassicActuarialAmortizationFactory(accrued_coupon_service= ActuarialAccruedCouponService())
+    position = factory.create_bond_position_calculator(make_position())
+    clean_price = position.acquisition_clean_price
+
+    factory.amortization_service.compute_amortized_price(bond_position= position, date= dates[0], yield_rate= 0.2)
+    yield_rate = position.compute_yield_rate()
+
+    assert position.acquisition_clean_price == clean_price
+    assert factory.amortization_service.compute_amortized_price(bond_position= position, date= dates[0]) == position.compute_amortized_price(dates[0])
+    assert position.compute_yield_rate() == yield_rate
+
+
+def test_shared_calculators_give_the_sequential_values_across_threads(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory(accrued_coupon_service= ActuarialAccruedCouponService())
+    positions = [make_position(make_bond(security_id= f"THREAD{i % 3}"), price= 90 + i) for i in range(12)]
+    expected = [
+        [ClassicActuarialAmortizationFactory(accrued_coupon_service= ActuarialAccruedCouponService()).create_bond_position_calculator(position).compute_amortized_price(date) for date in dates]
+        for position in positions
+    ]
+    calculators = [factory.create_bond_position_calculator(position) for position in positions]
+
+    def price(i): return i % len(calculators), [calculators[i % len(calculators)].compute_amortized_price(date) for date in dates]
+    with ThreadPoolExecutor(max_workers= 8) as executor: results = list(executor.map(price, range(96)))
+
+    for i, prices in results:
+        assert np.allclose(prices, expected[i], rtol= 1E-9)
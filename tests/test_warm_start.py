@@ -0,0 +1,47 @@
+import datetime
+import pytest
+
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+from services.yield_rate import YieldRateService
+
+acquisition_date = datetime.datetime(2022, 6, 1)
+
+
+def test_warm_started_yields_match_cold_ones_in_fewer_evaluations(make_bond, make_position):
+    bond = make_bond(security_id= "WARM")
+    positions = [make_position(bond, price= 95 + i * 0.001, acquisition_date= acquisition_date + datetime.timedelta(days= i)) for i in range(20)]
+    warm, cold = ClassicActuarialAmortizationFactory(), ClassicActuarialAmortizationFactory()
+    cold.yield_rate_service.warm_start = False
+
+    warm_yields = [warm.create_bond_position_calculator(position).compute_yield_rate() for position in positions]
+    cold_yields = [cold.create_bond_position_calculator(position).compute_yield_rate() for position in positions]
+
+    assert warm_yields == pytest.approx(cold_yields, abs= 1E-9)
+    statistics = warm.yield_rate_service.statistics
+    assert statistics["grid_seeds"] == 1 and statistics["sibling_seeds"] == len(positions) - 1
+    assert statistics["evaluations"] < cold.yield_rate_service.statistics["evaluations"]
+
+
+def test_sibling_estimates_need_a_close_date_and_price(make_bond, make_position):
+    factory = ClassicActuarialAmortizationFactory()
+    service = factory.yield_rate_service
+    bond = make_bond(security_id= "SIBLING")
+    factory.create_bond_position_calculator(make_position(bond, price= 95)).compute_yield_rate()
+    estimate = lambda price, days : service.estimate_yield_rate(
+        bond_position= factory.create_bond_position_calculator(make_position(bond, price= price)), date= acquisition_date + datetime.timedelta(days= days))[1]
+
+    assert estimate(95.5, 10) == "sibling"
+    assert estimate(95.5, 40) == "grid"
+    assert estimate(99, 0) == "grid"
+    assert service.estimate_yield_rate(bond_position= factory.create_bond_position_calculator(make_position(make_bond(security_id= "OTHER"), price= 95)), date= acquisition_date)[1] == "grid"
+
+
+def test_kept_siblings_are_bounded_sorted_and_spread(make_bond):
+    service = YieldRateService(amortization_service= ClassicActuarialAmortizationFactory().amortization_service, max_siblings= 5)
+    bond = make_bond()
+    for days in (0, 100, 50, 10, 200, 11, 150, 12):
+        service._add_sibling(bond= bond, sibling= (acquisition_date + datetime.timedelta(days= days), 1., 0.05))
+
+    dates = [sibling[0] for sibling in service._solved_yields[bond]]
+    assert len(dates) == 5 and dates == sorted(dates)
+    assert dates[0] == acquisition_date and dates[-1] == acquisition_date + datetime.timedelta(days= 200)
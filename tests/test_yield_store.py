@@ -0,0 +1,49 @@
+import pytest
+
+from services.yield_store import SQLiteYieldStore, compute_yield_fingerprint
+from services.inflation import ForcedFixedInflationService
+from services.solver import SolverNewtonRaphsonStandard, SolverBrent
+from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+
+def test_round_trip_through_a_new_store_skips_the_solve(tmp_path, make_bond, make_position):
+    path = str(tmp_path / "yields.db")
+    positions = [make_position(make_bond(security_id= "STORE"), price= price) for price in (95, 98, 101)]
+
+    store = SQLiteYieldStore(path)
+    factory = ClassicActuarialAmortizationFactory(yield_store= store)
+    yields = [factory.create_bond_position_calculator(position).compute_yield_rate() for position in positions]
+    store.close()
+
+    reopened_store = SQLiteYieldStore(path)
+    factory = ClassicActuarialAmortizationFactory(yield_store= reopened_store)
+    calculators = [factory.create_bond_position_calculator(position) for position in positions]
+    assert factory.yield_rate_service.prefetch(calculators) == len(positions)
+    assert [calculator.compute_yield_rate() for calculator in calculators] == yields
+    assert factory.yield_rate_service.statistics["solves"] == 0
+    reopened_store.close()
+
+
+def test_fingerprint_depends_on_the_position_and_the_services(make_bond, make_position):
+    fingerprint = lambda factory, price = 98 : compute_yield_fingerprint(
+        bond_position= factory.create_bond_position_calculator(make_position(make_bond(), price= price)), yield_rate_service= factory.yield_rate_service)
+    reference = fingerprint(ClassicActuarialAmortizationFactory())
+
+    assert fingerprint(ClassicActuarialAmortizationFactory()) == reference
+    assert fingerprint(ClassicActuarialAmortizationFactory(), price= 99) != reference
+    assert fingerprint(ClassicActuarialAmortizationFactory(solver= SolverBrent())) != reference
+    assert fingerprint(ClassicActuarialAmortizationFactory(solver= SolverNewtonRaphsonStandard(precision= 1E-3))) != reference
+    assert fingerprint(ClassicActuarialAmortizationFactory(inflation_service= ForcedFixedInflationService())) != reference
+
+
+def test_a_shared_store_keeps_the_yields_of_each_inflation_service(tmp_path, make_bond, make_position):
+    store = SQLiteYieldStore(str(tmp_path / "yields.db"))
+    bond = make_bond()
+    bond.inflation_coefficients = {bond.emission_date : 1.5}
+    no_inflation_yield = ClassicActuarialAmortizationFactory(yield_store= store).create_bond_position_calculator(make_position(bond)).compute_yield_rate()
+
+    forced_fixed = ClassicActuarialAmortizationFactory(yield_store= store, inflation_service= ForcedFixedInflationService())
+    expected = ClassicActuarialAmortizationFactory(inflation_service= ForcedFixedInflationService()).create_bond_position_calculator(make_position(bond)).compute_yield_rate()
+    assert forced_fixed.create_bond_position_calculator(make_position(bond)).compute_yield_rate() == pytest.approx(expected, rel= 1E-12)
+    assert expected != pytest.approx(no_inflation_yield)
+    store.close()
@@ -0,0 +1,17 @@
+import numpy as np
+
+def dedupe(items : list, key):
+    """
+    Returns (unique_items, inverse) : the first item of each distinct key(item), and for each item the index of its unique item,
+    so that results[inverse] maps results computed on unique_items back to items.
+    """
+    indexes = {}
+    unique_items = []
+    inverse = np.empty(len(items), dtype= int)
+    for i, item in enumerate(items):
+        item_key = key(item)
+        if item_key not in indexes:
+            indexes[item_key] = len(unique_items)
+            unique_items.append(item)
+        inverse[i] = indexes[item_key]
+    return unique_items, inverse
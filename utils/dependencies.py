@@ -0,0 +1,41 @@
+import threading
+
+
+class DependencyTracker:
+    """
+    Generations of the inputs cached results are computed from. Inputs are identified by dependency keys (hashable tuples) :
+    Cashflows.dependency, InflationCoefficients.dependency, BondPosition.dependency and the dependencies of the inflation services.
+    A cached result is stored with the generation of its inputs (its stamp) : once one of them is invalidated, the result is recomputed on its
+    next access, every other cached result is kept.
+    generation counts the invalidations : while it is unchanged, no stamp needs to be checked.
+    """
+    def __init__(self):
+        self.generation = 0
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def stamp(self, dependencies) -> tuple:
+        """((dependency, generation), ...) of the inputs."""
+        generations = self._generations
+        return tuple((dependency, generations.get(dependency, 0)) for dependency in dependencies)
+
+    def invalidate(self, *dependencies):
+        with self._lock:
+            for dependency in dependencies: self._generations[dependency] = self._generations.get(dependency, 0) + 1
+            self.generation += 1
+
+    def get_or_compute(self, entry, dependencies, compute):
+        """
+        Returns (entry, value). entry is None or (generation, stamp, value) as returned by a previous call : its value is kept while its inputs
+        are not invalidated, else compute() is called. dependencies : callable returning the inputs (only called after an invalidation).
+        """
+        # Generation and stamp are read before computing : an invalidation during compute() is seen on the next access
+        generation = self.generation
+        if entry is not None and entry[0] == generation: return entry, entry[2]
+        stamp = self.stamp(dependencies())
+        if entry is not None and entry[1] == stamp: return (generation, stamp, entry[2]), entry[2]
+        value = compute()
+        return (generation, stamp, value), value
+
+# Shared by every cache of the process (services caches are shared by their instances too)
+dependency_tracker = DependencyTracker()
@@ -0,0 +1,33 @@
+import os
+import sys
+import subprocess
+
+import settings
+
+_project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_measure_code = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+def measure_import_time(module : str, repeat = 3):
+    """Returns the best import time (seconds) of `module` over `repeat` fresh interpreters."""
+    timings = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _measure_code.format(module = module)],
+            cwd = _project_root, capture_output = True, text = True, check = True
+        )
+        timings.append(float(output.stdout.strip()))
+    return min(timings)
+
+def check_import_time_budget(modules : list, budget = None):
+    budget = settings.import_time_budget if budget is None else budget
+    timings = {module : measure_import_time(module) for module in modules}
+    return {module : timing for module, timing in timings.items() if timing > budget}, timings
+
+
+if __name__ == "__main__":
+    # python -m utils.import_time
+    modules = ["factories.amortization.actuarial", "factories.amortization.linear", "factories.amortization.full"]
+    over_budget, timings = check_import_time_budget(modules)
+    for module, timing in timings.items():
+        print(f"{module :40s}: {timing*1000:7.1f}ms {'(over budget)' if module in over_budget else ''}")
+    sys.exit(1 if over_budget else 0)
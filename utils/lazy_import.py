@@ -0,0 +1,18 @@
+import sys
+import importlib.util
+
+def lazy_import(name : str):
+    """
+    Returns the module `name` without executing it. The module is loaded on the first attribute access.
+    Used for heavy dependencies (pandas, dateutil) so that importing factories stays cheap.
+    """
+    if name in sys.modules: return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None: raise ModuleNotFoundError(f"No module named '{name}'", name = name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -1,37 +1,68 @@
 from collections import OrderedDict
 from functools import wraps
+import threading
 import copy
-def lru_cache(maxsize=128):
+
+from utils.dependencies import dependency_tracker
+from utils.metrics import metrics
+
+_missing = object()
+
+def lru_cache(maxsize=128, key=None, dependencies=None):
     """
     A custom LRU cache decorator that uses a hash of (args, kwargs) to generate cache keys.
 
     :param maxsize: Maximum number of cache entries to store. (Default: 128)
+    :param key: Optional function called with the same arguments as the decorated function, returning what is hashed instead of (args, kwargs).
+    :param dependencies: Optional function called with the same arguments as the decorated function, returning the inputs the result is computed from
+    (dependency keys, see utils.dependencies). An entry is recomputed once one of its inputs is invalidated.
+    The cache is thread safe. The function itself is computed outside the lock (two threads may compute the same entry).
     """
     def decorator(func):
         cache = OrderedDict()
+        lock = threading.Lock()
 
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Create a cache key by hashing a tuple of:
             # - args
             # - a frozenset of the kwargs items (so it can be hashed)
-            cache_key = hash((args, frozenset(kwargs.items())))
+            cache_key = hash((args, frozenset(kwargs.items()))) if key is None else hash(key(*args, **kwargs))
 
-            if cache_key in cache:
+            with lock:
+                entry = cache.get(cache_key, _missing)
                 # If the result is in the cache, move it to the end to mark it as recently used
-                cache.move_to_end(cache_key)
-                return cache[cache_key]
-            
+                if entry is not _missing: cache.move_to_end(cache_key)
+
+            if dependencies is None:
+                if entry is not _missing:
+                    if metrics.enabled: metrics.increment("cache_requests_total", cache= func.__qualname__, result= "hit")
+                    return entry
+            else:
+                # Entries are (generation, stamp, result) : kept while none of their inputs is invalidated (see DependencyTracker.get_or_compute)
+                generation = dependency_tracker.generation
+                if entry is not _missing and entry[0] == generation:
+                    if metrics.enabled: metrics.increment("cache_requests_total", cache= func.__qualname__, result= "hit")
+                    return entry[2]
+                stamp = dependency_tracker.stamp(dependencies(*args, **kwargs))
+                if entry is not _missing and entry[1] == stamp:
+                    with lock:
+                        if cache_key in cache: cache[cache_key] = (generation, stamp, entry[2])
+                    if metrics.enabled: metrics.increment("cache_requests_total", cache= func.__qualname__, result= "hit")
+                    return entry[2]
+
             # Otherwise, compute the result
+            if metrics.enabled: metrics.increment("cache_requests_total", cache= func.__qualname__, result= "miss")
             # print("args", args, "kwargs", frozenset(kwargs.items()), ", key = ", cache_key)
             result = func(*args, **kwargs)
             # Store it in the cache
-            cache[cache_key] =copy.copy(result)
-            cache.move_to_end(cache_key)
+            with lock:
+                cache[cache_key] =copy.copy(result) if dependencies is None else (generation, stamp, copy.copy(result))
+                cache.move_to_end(cache_key)
 
-            # If we exceed maxsize, remove the least recently used item
-            if len(cache) > maxsize:
-                cache.popitem(last=False)
+                # If we exceed maxsize, remove the least recently used item
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
 
             return result
 
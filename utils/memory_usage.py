@@ -0,0 +1,52 @@
+import sys
+import gc
+import datetime
+import tracemalloc
+
+import settings
+
+def measure_memory_per_position(nb_positions = 20_000):
+    """Returns the memory (bytes) allocated per bond position and per bond position calculator, all positions sharing one bond."""
+    from classes.bond import Bond
+    from classes.bond_position import BondPosition
+    from classes.cashflows import Cashflows
+    from classes.time_convention import TimeConvention
+    from factories.amortization.actuarial import ClassicActuarialAmortizationFactory
+
+    dates = [datetime.datetime(2021 + i, 1, 1) for i in range(10)]
+    bond = Bond(
+        emission_date= datetime.datetime(2020, 1, 1), maturity_date= dates[-1],
+        coupons= Cashflows(dates= dates, amounts= [3.] * len(dates)),
+        redemptions= Cashflows(dates= dates[-1:], amounts= [100.]),
+        time_convention= TimeConvention.ACT_ACT_ICMA, security_id= "MEMORY_USAGE",
+    )
+    factory = ClassicActuarialAmortizationFactory()
+    factory.create_bond_calculator(bond= bond)
+    acquisition_date = datetime.datetime(2022, 6, 1)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        bond_positions = [
+            BondPosition(bond= bond, nominal= float(i), acquisition_date= acquisition_date, acquisition_clean_price= float(i))
+            for i in range(nb_positions)
+        ]
+        positions_memory = tracemalloc.get_traced_memory()[0]
+        calculators = [factory.create_bond_position_calculator(bond_position= bond_position) for bond_position in bond_positions]
+        calculators_memory = tracemalloc.get_traced_memory()[0] - positions_memory
+    finally:
+        tracemalloc.stop()
+    return {"position" : positions_memory / nb_positions, "calculator" : calculators_memory / len(calculators)}
+
+def check_memory_per_position_budget(budget = None):
+    budget = settings.memory_per_position_budget if budget is None else budget
+    memory = measure_memory_per_position()
+    return {name : size for name, size in memory.items() if size > budget}, memory
+
+
+if __name__ == "__main__":
+    # python -m utils.memory_usage
+    over_budget, memory = check_memory_per_position_budget()
+    for name, size in memory.items():
+        print(f"{name :12s}: {size:7.1f} bytes {'(over budget)' if name in over_budget else ''}")
+    sys.exit(1 if over_budget else 0)
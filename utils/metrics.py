@@ -0,0 +1,168 @@
+import os
+import time
+import bisect
+import threading
+from functools import wraps
+
+import settings
+
+# Histogram buckets (upper bounds)
+latency_buckets = (1E-5, 2.5E-5, 5E-5, 1E-4, 2.5E-4, 5E-4, 1E-3, 2.5E-3, 5E-3, 1E-2, 2.5E-2, 5E-2, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30., 60.)
+evaluation_buckets = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100, 200)
+
+# name : help
+_descriptions = {
+    "call_duration_seconds" : "Latency of instrumented calls (seconds).",
+    "cache_requests_total" : "Requests to the lru caches, by result (hit / miss).",
+    "cache_hit_ratio" : "Hits / requests of the lru caches.",
+    "solver_evaluations" : "Equation evaluations per yield solve.",
+    "positions_valued_total" : "Positions valued by portfolio runs.",
+    "run_duration_seconds" : "Duration of portfolio runs (seconds).",
+    "positions_per_second" : "Throughput of the last portfolio run.",
+}
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets : tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1) # Last one : above every bucket (+Inf)
+        self.sum = 0.
+        self.count = 0
+
+    def observe(self, value : float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels : tuple):
+    if len(labels) == 0: return ""
+    escape = lambda value : str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+class MetricsRegistry:
+    """
+    Prometheus style metrics of the library : labelled counters, gauges and histograms.
+    Disabled by default (settings.metrics_enabled) : instrumented calls then only check the enabled flag.
+    Exposed in Prometheus text format with render(), write(path) (textfile collectors) or serve(port) (local HTTP endpoint).
+    """
+    def __init__(self, enabled = None, prefix = "bond_amortization"):
+        self.enabled = enabled if enabled is not None else settings.metrics_enabled
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counters = {} # (name, labels) : value
+            self._gauges = {} # (name, labels) : value
+            self._histograms = {} # (name, labels) : _Histogram
+
+    def increment(self, name : str, value = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock: self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name : str, value : float, **labels):
+        with self._lock: self._gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name : str, value : float, buckets = latency_buckets, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None: histogram = self._histograms[key] = _Histogram(buckets= buckets)
+            histogram.observe(value)
+
+    def record_run(self, run : str, nb_positions : int, elapsed : float):
+        """Throughput of a portfolio run : positions valued, duration and positions per second."""
+        self.increment("positions_valued_total", nb_positions, run= run)
+        self.observe("run_duration_seconds", elapsed, run= run)
+        if elapsed > 0: self.set("positions_per_second", nb_positions / elapsed, run= run)
+
+    def _cache_hit_ratios(self):
+        requests = {}
+        for (name, labels), value in self._counters.items():
+            if name != "cache_requests_total": continue
+            labels = dict(labels)
+            hits_requests = requests.setdefault((("cache", labels["cache"]),), [0, 0])
+            hits_requests[0] += value if labels["result"] == "hit" else 0
+            hits_requests[1] += value
+        return {("cache_hit_ratio", labels) : hits / total for labels, (hits, total) in requests.items() if total > 0}
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            counters, gauges = dict(self._counters), {**self._gauges, **self._cache_hit_ratios()}
+            histograms = {key : (histogram.buckets, list(histogram.counts), histogram.sum, histogram.count) for key, histogram in self._histograms.items()}
+
+        lines = []
+        samples_by_name = {} # name : (type, [(labels, value)])
+        for metric_type, samples in (("counter", counters), ("gauge", gauges), ("histogram", histograms)):
+            for (name, labels), value in samples.items(): samples_by_name.setdefault(name, (metric_type, []))[1].append((labels, value))
+
+        for name in sorted(samples_by_name):
+            metric_type, samples = samples_by_name[name]
+            full_name = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {full_name} {_descriptions.get(name, name)}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            for labels, value in sorted(samples, key= lambda sample : sample[0]):
+                if metric_type != "histogram":
+                    lines.append(f"{full_name}{_format_labels(labels)} {value if isinstance(value, int) else float(value)!r}")
+                    continue
+                buckets, counts, total, count = value
+                cumulated = 0
+                for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts):
+                    cumulated += bucket_count
+                    lines.append(f"{full_name}_bucket{_format_labels(labels + (('le', bound),))} {cumulated}")
+                lines.append(f"{full_name}_sum{_format_labels(labels)} {float(total)!r}")
+                lines.append(f"{full_name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path : str):
+        """Writes render() to path atomically (ex : node_exporter textfile collector directory)."""
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as file: file.write(self.render())
+        os.replace(temporary_path, path)
+
+    def serve(self, port = 9464, host = "127.0.0.1"):
+        """Serves render() on http://host:port/metrics from a daemon thread. Returns the server (server.shutdown() to stop it)."""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args): pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target= server.serve_forever, daemon= True).start()
+        return server
+
+# Registry of the process, used by the instrumented services
+metrics = MetricsRegistry()
+
+
+def timed(function_name : str):
+    """Decorator recording the latency of a service method in call_duration_seconds{function, service} (when metrics are enabled)."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled: return func(*args, **kwargs)
+            start = time.perf_counter()
+            try: return func(*args, **kwargs)
+            finally:
+                service = args[0].__class__.__name__ if args else ""
+                metrics.observe("call_duration_seconds", time.perf_counter() - start, function= function_name, service= service)
+        return wrapper
+    return decorator
@@ -24,4 +24,4 @@ class NumpyDateUtils:
     # Day methods
     @classmethod
     def get_days(cls, dates : np.ndarray):
-        return (dates - dates.astype('datetime64[M]')).astype(int) + 1
\ No newline at end of file
+        return (dates.astype('datetime64[D]') - dates.astype('datetime64[M]')).astype(int) + 1
\ No newline at end of file
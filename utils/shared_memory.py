@@ -0,0 +1,51 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+from classes.cashflows import Cashflows
+
+# Blocks attached by this process, kept open for its lifetime (the arrays of attached Cashflows point into them)
+_attached_blocks = {}
+
+def attach_cashflows(name : str, offset : int, length : int, dates_dtype : str, fingerprint = None):
+    """Cashflows backed by a SharedCashflowsBlock, without copy (read only)."""
+    if name not in _attached_blocks: _attached_blocks[name] = shared_memory.SharedMemory(name= name)
+    buffer = _attached_blocks[name].buf
+    dates = np.ndarray(shape= (length,), dtype= dates_dtype, buffer= buffer, offset= offset)
+    amounts = np.ndarray(shape= (length,), dtype= float, buffer= buffer, offset= offset + dates.nbytes)
+    dates.flags.writeable = amounts.flags.writeable = False
+    return Cashflows._from_arrays(dates= dates, amounts= amounts, fingerprint= fingerprint)
+
+
+class SharedCashflowsBlock:
+    """
+    Copies the coupon and redemption schedules of bonds into one multiprocessing.shared_memory block.
+    Once shared, pickled Cashflows only carry their location in the block : worker processes attach to it zero-copy.
+    The owner keeps its private arrays. The block must outlive the workers : close() it (or use a with statement) when done.
+    """
+    def __init__(self, bonds : list):
+        cashflows_list = list({id(cashflows) : cashflows for bond in bonds for cashflows in (bond.coupons, bond.redemptions)}.values())
+        size = sum(len(cashflows) * (cashflows.dates.itemsize + 8) for cashflows in cashflows_list)
+        self._shared_memory = shared_memory.SharedMemory(create= True, size= max(size, 1))
+        self._cashflows_list = cashflows_list
+
+        offset = 0
+        for cashflows in cashflows_list:
+            dates, amounts = cashflows.dates, np.asarray(cashflows.amounts, dtype= float)
+            np.ndarray(shape= dates.shape, dtype= dates.dtype, buffer= self._shared_memory.buf, offset= offset)[:] = dates
+            np.ndarray(shape= amounts.shape, dtype= float, buffer= self._shared_memory.buf, offset= offset + dates.nbytes)[:] = amounts
+            cashflows._shared = (self.name, offset, len(dates), str(dates.dtype))
+            offset += dates.nbytes + amounts.nbytes
+
+    @property
+    def name(self): return self._shared_memory.name
+
+    def close(self):
+        """Pickled Cashflows go back to carrying their arrays, then the block is released."""
+        for cashflows in self._cashflows_list:
+            if cashflows._shared is not None and cashflows._shared[0] == self.name: cashflows._shared = None
+        self._cashflows_list = []
+        self._shared_memory.close()
+        self._shared_memory.unlink()
+
+    def __enter__(self): return self
+    def __exit__(self, *args): self.close()
@@ -0,0 +1,24 @@
+def iter_slots(cls):
+    """Every slot name declared by cls and its parents."""
+    for klass in cls.__mro__:
+        slots = getattr(klass, "__slots__", ())
+        if isinstance(slots, str): slots = (slots,)
+        for slot in slots:
+            if slot not in ("__dict__", "__weakref__"): yield slot
+
+def copy_slots(source, target):
+    """Copies every attribute set on source (slots and __dict__ if any) onto target."""
+    for slot in iter_slots(type(source)):
+        if hasattr(source, slot): setattr(target, slot, getattr(source, slot))
+    for name, value in getattr(source, "__dict__", {}).items():
+        setattr(target, name, value)
+
+def get_slots_state(source, cls):
+    """{slot : value} of the slots of cls (and its parents) set on source : attributes added by subclasses are left out."""
+    return {slot : getattr(source, slot) for slot in iter_slots(cls) if hasattr(source, slot)}
+
+def restore_slots(cls, state : dict):
+    """Unpickling counterpart of get_slots_state : creates a cls instance without calling __init__."""
+    instance = cls.__new__(cls)
+    for slot, value in state.items(): setattr(instance, slot, value)
+    return instance